@@ -0,0 +1,142 @@
+import numpy as np
+
+from engine import FleetGenerator, ships_lens
+
+# Результаты выстрела
+OUT = -2  # Выстрел за пределы поля
+REPEAT = -1  # В клетку уже стреляли или она в ареале уничтоженного корабля
+MISS = 0  # Промах
+HIT = 1  # Корабль повреждён
+SUNK = 2  # Корабль уничтожен
+
+# Смещения соседних клеток вместе с самой клеткой
+AROUND = np.array([(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1)])
+
+
+# Координаты клеток кораблей флотов fleets формы (K, n, 3): x, y, расположение носа каждого корабля.
+# Возвращает x, y формы (K, n, L) и маску used существующих клеток (корабль короче L).
+def fleet_cells(fleets, lens):
+    fleets = np.asarray(fleets, dtype=np.int64)
+    lens = np.asarray(lens)
+    steps = np.arange(lens.max())
+    used = steps[None, :] < lens[:, None]  # (n, L)
+    orientation = fleets[..., 2:3]
+    xs = fleets[..., 0:1] + steps * orientation
+    ys = fleets[..., 1:2] + steps * (1 - orientation)
+    return xs, ys, np.broadcast_to(used, xs.shape)
+
+
+# Проверка сразу всех флотов: корабли внутри поля, не пересекаются и не касаются друг друга.
+# Возвращает массив bool формы (K,).
+def validate(fleets, size, lens):
+    xs, ys, used = fleet_cells(fleets, lens)
+    count, n, _ = xs.shape
+    inside = (xs >= 0) & (xs < size) & (ys >= 0) & (ys < size)
+    valid = np.all(inside | ~used, axis=(1, 2)) & np.all(np.isin(np.asarray(fleets)[..., 2], (0, 1)), axis=1)
+
+    # Номер корабля в каждой клетке поля с рамкой шириной в одну клетку
+    grid = np.full((count, size + 2, size + 2), -1, dtype=np.int32)
+    occupied = np.zeros((count, size + 2, size + 2), dtype=np.int32)
+    cells = used & inside
+    boards = np.broadcast_to(np.arange(count)[:, None, None], xs.shape)[cells]
+    ships = np.broadcast_to(np.arange(n)[None, :, None], xs.shape)[cells]
+    cx, cy = xs[cells] + 1, ys[cells] + 1
+    np.add.at(occupied, (boards, cx, cy), 1)
+    grid[boards, cx, cy] = ships
+    valid &= ~np.any(occupied > 1, axis=(1, 2))
+
+    # Соседняя клетка любого корабля должна быть пустой или принадлежать ему же
+    neighbours = grid[boards[:, None], cx[:, None] + AROUND[:, 0], cy[:, None] + AROUND[:, 1]]
+    touch = np.any((neighbours >= 0) & (neighbours != ships[:, None]), axis=1)
+    valid[np.unique(boards[touch])] = False
+    return valid
+
+
+class BoardBatch:
+    # K досок одного размера с одинаковым набором кораблей в виде массивов NumPy.
+    # Выстрел делается сразу по всем доскам: по одной клетке на каждую доску.
+    def __init__(self, fleets, size, lens):
+        fleets = np.asarray(fleets, dtype=np.int64)
+        self.size = size
+        self.lens = np.asarray(lens)
+        self.count = len(fleets)  # Кол-во досок
+        ships = len(lens)
+        cells = size * size
+        rows = np.arange(self.count)
+
+        xs, ys, used = fleet_cells(fleets, lens)
+        boards = np.broadcast_to(rows[:, None, None], xs.shape)[used]
+        numbers = np.broadcast_to(np.arange(ships)[None, :, None], xs.shape)[used]
+        index = (xs * size + ys)[used]
+
+        self.ship_id = np.full((self.count, cells), -1, dtype=np.int16)  # Номер корабля в клетке
+        self.ship_id[boards, index] = numbers
+        self.lives = np.broadcast_to(self.lens, (self.count, ships)).astype(np.int16)  # Жизни кораблей
+        self.shots = np.zeros((self.count, cells), dtype=bool)  # В клетку стреляли
+        self.marked = np.zeros((self.count, cells), dtype=bool)  # Ареал уничтоженного корабля
+        self.destroyed = np.zeros(self.count, dtype=np.int16)  # Кол-во уничтоженных кораблей
+
+        # Ареал каждого корабля: (K, n, клетки)
+        self.area = np.zeros((self.count, ships, cells), dtype=bool)
+        ax = xs[..., None] + AROUND[:, 0]
+        ay = ys[..., None] + AROUND[:, 1]
+        inside = (ax >= 0) & (ax < size) & (ay >= 0) & (ay < size) & used[..., None]
+        self.area[
+            np.broadcast_to(rows[:, None, None, None], ax.shape)[inside],
+            np.broadcast_to(np.arange(ships)[None, :, None, None], ax.shape)[inside],
+            (ax * size + ay)[inside],
+        ] = True
+
+    # K случайных досок для размера поля size
+    @classmethod
+    def random(cls, count, size, lens=None):
+        if lens is None:
+            lens = ships_lens(size)
+        generator = FleetGenerator.get(size, lens)
+        order = generator.lens
+        fleets = []
+        for fleet in generator.fleets(count):
+            # Корабли в том же порядке, что и длины generator.lens
+            fleet = sorted(fleet, key=lambda ship: -ship[3])
+            fleets.append([(x, y, orientation) for x, y, orientation, _ in fleet])
+        return cls(fleets, size, order)
+
+    # Выстрел по всем доскам: x, y - массивы координат формы (K,).
+    # Возвращает массив результатов OUT, REPEAT, MISS, HIT или SUNK.
+    def shot(self, x, y):
+        x = np.asarray(x)
+        y = np.asarray(y)
+        rows = np.arange(self.count)
+        result = np.full(self.count, OUT, dtype=np.int8)
+
+        inside = (x >= 0) & (x < self.size) & (y >= 0) & (y < self.size)
+        index = np.where(inside, x * self.size + y, 0)
+        busy = self.shots[rows, index] | self.marked[rows, index]
+        result[inside & busy] = REPEAT
+
+        fresh = rows[inside & ~busy]
+        cell = index[fresh]
+        self.shots[fresh, cell] = True
+        number = self.ship_id[fresh, cell]
+        result[fresh] = MISS
+
+        hit = number >= 0
+        boards, number = fresh[hit], number[hit]
+        self.lives[boards, number] -= 1
+        result[boards] = HIT
+
+        sunk = self.lives[boards, number] == 0
+        boards, number = boards[sunk], number[sunk]
+        result[boards] = SUNK
+        self.destroyed[boards] += 1
+        # Помечаем ареал уничтоженных кораблей, кроме клеток, куда уже стреляли
+        self.marked[boards] |= self.area[boards, number] & ~self.shots[boards]
+        return result
+
+    # Доски, на которых уничтожены все корабли
+    def defeat(self):
+        return self.destroyed == len(self.lens)
+
+    # Клетки, в которые еще можно стрелять: (K, клетки)
+    def available(self):
+        return ~(self.shots | self.marked)
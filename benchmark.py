@@ -0,0 +1,263 @@
+import argparse
+import json
+import platform
+import random
+import subprocess
+import time
+
+from engine import AI, BaseGame, BitBoard, Dot, FleetGenerator, PreviouslyShotCellException, ships_lens
+from simulator import HeadlessGame
+from strategies import DensityAI, HuntTargetAI
+from terminal import ConsoleBoard
+
+SIZES = (6, 10, 20)  # Размеры досок для замеров
+
+
+#  Замер функции: run(state) выполняет ops операций над тем, что вернула setup().
+#  Подготовка не входит в замер. Возвращает время одной операции в микросекундах.
+def measure(run, ops, repeat, setup=lambda: None):
+    times = []
+    for _ in range(repeat):
+        state = setup()
+        started = time.perf_counter()
+        run(state)
+        times.append((time.perf_counter() - started) / ops * 1e6)
+    times.sort()
+    return {
+        "ops": ops,
+        "best_us": times[0],
+        "median_us": times[len(times) // 2],
+        "ops_per_sec": 1e6 / times[len(times) // 2],
+    }
+
+
+#  Одинаковые для всех запусков флоты
+def fleets(size, count, seed):
+    random.seed(seed)
+    generator = FleetGenerator.get(size, ships_lens(size))
+    return generator, list(generator.fleets(count))
+
+
+#  Новые доски с одинаковыми флотами
+def boards(generator, fleet_list, board_cls=BitBoard):
+    result = [generator.board(fleet, board_cls) for fleet in fleet_list]
+    for board in result:
+        board.quiet = True
+    return result
+
+
+#  Одинаковые для всех запусков флоты и порядок выстрелов по клеткам
+def shot_order(size, seed):
+    generator, fleet_list = fleets(size, 20, seed)
+    cells = [Dot(x, y) for x in range(size) for y in range(size)]
+    random.shuffle(cells)
+    return generator, fleet_list, cells
+
+
+#  Выстрелы по всем клеткам каждой доски в одном и том же случайном порядке. Замеряются только
+#  допустимые выстрелы: клетки, занятые ареалом уничтоженного корабля, пропускаются (их замеряет shot_rejected)
+def bench_shot(size, seed, repeat):
+    generator, fleet_list, cells = shot_order(size, seed)
+    legal = []  # Допустимые выстрелы для каждой доски
+    for board in boards(generator, fleet_list):
+        shots = []
+        for d in cells:
+            if not board.cells[board.index(d)] & BitBoard.BUSY:
+                board.shot(d)
+                shots.append(d)
+        legal.append(shots)
+
+    def run(state):
+        for board, shots in zip(state, legal):
+            for d in shots:
+                board.shot(d)
+
+    return measure(run, sum(len(shots) for shots in legal), repeat, lambda: boards(generator, fleet_list))
+
+
+#  Отклоненные выстрелы: повторный выстрел в каждую клетку доски, по которой уже стреляли везде
+def bench_shot_rejected(size, seed, repeat):
+    generator, fleet_list, cells = shot_order(size, seed)
+
+    def shoot_all(state):
+        for board in state:
+            for d in cells:
+                try:
+                    board.shot(d)
+                except PreviouslyShotCellException:
+                    pass
+
+    def setup():
+        state = boards(generator, fleet_list)
+        shoot_all(state)
+        return state
+
+    return measure(shoot_all, len(fleet_list) * len(cells), repeat, setup)
+
+
+#  Добавление кораблей на доску вместе с их ареалом
+def bench_add_ship(size, seed, repeat):
+    generator, fleet_list = fleets(size, 50, seed)
+    ships = sum(len(fleet) for fleet in fleet_list)
+    return measure(lambda state: boards(generator, fleet_list), ships, repeat)
+
+
+#  Ареал уничтоженного корабля на доске после начала игры
+def bench_contour(size, seed, repeat):
+    generator, fleet_list = fleets(size, 50, seed)
+    ships = sum(len(fleet) for fleet in fleet_list)
+
+    def run(state):
+        for board in state:
+            for ship in board.ships:
+                board.contour(ship, verb=True)
+
+    return measure(run, ships, repeat, lambda: boards(generator, fleet_list))
+
+
+def bench_try_board(size, seed, repeat):
+    random.seed(seed)
+    factory = BaseGame(size)
+    count = 200
+    return measure(lambda state: [factory.try_board() for _ in range(count)], count, repeat)
+
+
+def bench_random_board(size, seed, repeat):
+    random.seed(seed)
+    factory = BaseGame(size)
+    count = 200
+    return measure(lambda state: [factory.random_board() for _ in range(count)], count, repeat)
+
+
+#  Отрисовка всей доски
+def bench_str_full(size, seed, repeat):
+    generator, fleet_list = fleets(size, 50, seed)
+    return measure(lambda state: [str(board) for board in state], len(fleet_list), repeat,
+                   lambda: boards(generator, fleet_list, ConsoleBoard))
+
+
+#  Отрисовка доски, на которой с прошлой отрисовки изменилась одна клетка
+def bench_str_after_shot(size, seed, repeat):
+    generator, fleet_list = fleets(size, 50, seed)
+
+    def setup():
+        state = boards(generator, fleet_list, ConsoleBoard)
+        for board in state:
+            str(board)
+            board.shot(Dot(0, 0))
+        return state
+
+    return measure(lambda state: [str(board) for board in state], len(fleet_list), repeat, setup)
+
+
+#  Целые партии компьютер против компьютера без вывода в терминал
+def bench_game(first, second):
+    def bench(size, seed, repeat):
+        count = 20
+
+        def run(state):
+            random.seed(seed)
+            for _ in range(count):
+                HeadlessGame(size, first, second).loop()
+
+        return measure(run, count, repeat)
+
+    return bench
+
+
+BENCHMARKS = {
+    "shot": bench_shot,
+    "shot_rejected": bench_shot_rejected,
+    "add_ship": bench_add_ship,
+    "contour": bench_contour,
+    "try_board": bench_try_board,
+    "random_board": bench_random_board,
+    "str_full": bench_str_full,
+    "str_after_shot": bench_str_after_shot,
+    "game_random": bench_game(AI, AI),
+    "game_density": bench_game(DensityAI, DensityAI),
+    "game_hunt": bench_game(HuntTargetAI, HuntTargetAI),
+}
+
+
+#  Текущий коммит git, если доступен
+def commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(names, sizes, seed, repeat):
+    results = {}
+    for name in names:
+        for size in sizes:
+            results[f"{name}[{size}]"] = BENCHMARKS[name](size, seed, repeat)
+    return {
+        "meta": {
+            "commit": commit(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "seed": seed,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+#  Сравнение с результатами прошлого запуска: во сколько раз изменилось время операции
+def compare(report, baseline):
+    lines = []
+    for key, result in report["results"].items():
+        old = baseline["results"].get(key)
+        if old is None or not result["median_us"]:
+            lines.append(f"{key:<24} {result['median_us']:>12.2f} us")
+            continue
+        ratio = old["median_us"] / result["median_us"]
+        lines.append(f"{key:<24} {result['median_us']:>12.2f} us  было {old['median_us']:>12.2f} us  x{ratio:.2f}")
+    return "\n".join(lines)
+
+
+#  Замеры, медиана которых выросла больше чем в limit раз по сравнению с прошлым запуском
+def regressions(report, baseline, limit):
+    slow = []
+    for key, result in report["results"].items():
+        old = baseline["results"].get(key)
+        if old is not None and old["median_us"] and result["median_us"] / old["median_us"] > limit:
+            slow.append(key)
+    return slow
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Замеры скорости движка морского боя")
+    parser.add_argument("-b", "--bench", action="append", choices=sorted(BENCHMARKS),
+                        help="замер (можно несколько, по умолчанию все)")
+    parser.add_argument("-s", "--size", type=int, action="append", help="размер доски (по умолчанию 6, 10, 20)")
+    parser.add_argument("--seed", type=int, default=12345, help="начальное значение генератора случайных чисел")
+    parser.add_argument("--repeat", type=int, default=5, help="кол-во повторов каждого замера")
+    parser.add_argument("-o", "--output", help="файл для результатов в формате JSON")
+    parser.add_argument("--compare", help="файл JSON с результатами прошлого запуска")
+    parser.add_argument("--fail-over", type=float, metavar="RATIO",
+                        help="завершиться с ошибкой, если медиана замера медленнее прошлой больше чем в RATIO раз")
+    args = parser.parse_args(argv)
+    if args.fail_over is not None and not args.compare:
+        parser.error("--fail-over работает только вместе с --compare")
+
+    report = run_benchmarks(args.bench or list(BENCHMARKS), args.size or SIZES, args.seed, args.repeat)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    baseline = {"results": {}}
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print(compare(report, baseline))
+    if args.fail_over is not None:
+        slow = regressions(report, baseline, args.fail_over)
+        if slow:
+            parser.exit(1, f"Замедлились больше чем в {args.fail_over} раз: {', '.join(slow)}\n")
+
+
+if __name__ == "__main__":
+    main()
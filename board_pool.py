@@ -0,0 +1,161 @@
+import json
+import logging
+import os
+import random
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from engine import BitBoard, FleetGenerator, board_dims, fleet_key
+
+# Запас готовых расстановок флота, чтобы выдача доски не ждала расстановку кораблей.
+# Запас пополняется в фоновом потоке (а расстановки могут считаться в отдельных процессах),
+# когда для какой-то доски в нем остается меньше low_water расстановок.
+CAPACITY = 256  # Сколько расстановок держать для каждой доски
+LOW_WATER = 64  # Когда запас меньше этого, он пополняется
+BATCH = 32  # Сколько расстановок считать за один раз
+
+log = logging.getLogger(__name__)
+
+
+#  count расстановок флота; seed нужен, чтобы процессы пула не повторяли друг друга
+def generate_fleets(size, lens, count, seed=None):
+    if seed is not None:
+        random.seed(seed)
+    return [tuple(map(tuple, fleet)) for fleet in FleetGenerator.get(size, lens).fleets(count)]
+
+
+class BoardPool:
+    # Запас расстановок для каждой пары (размер доски, набор кораблей), которую запрашивали
+    # или прогрели заранее. Если запас кончился, доска расставляется сразу, как без запаса.
+    def __init__(self, capacity=CAPACITY, low_water=LOW_WATER, path=None, processes=0):
+        self.capacity = capacity
+        self.low_water = low_water
+        self.path = path  # Файл, в котором запас хранится между запусками
+        self.fleets = {}  # Ключ доски -> очередь расстановок
+        self.specs = {}  # Ключ доски -> (размер, длины кораблей)
+        self.filling = set()  # Доски, запас которых пополняется
+        self.failed = {}  # Доски, для которых расстановки считать не удалось: ключ -> ошибка
+        self.hits = 0  # Доски, выданные из запаса
+        self.misses = 0  # Доски, расставленные при запросе
+        self.lock = threading.Condition()
+        self.closed = False
+        self.executor = ProcessPoolExecutor(processes) if processes else None
+        if path and os.path.exists(path):
+            self.load(path)
+        self.thread = threading.Thread(target=self._refill, name="board-pool", daemon=True)
+        self.thread.start()
+
+    #  Начать пополнение запаса для доски заранее
+    def warm(self, size, lens):
+        with self.lock:
+            self._register(size, lens)
+            self.lock.notify()
+
+    def _register(self, size, lens):
+        key = fleet_key(size, lens)
+        if key not in self.fleets:
+            self.fleets[key] = deque()
+            self.specs[key] = (size, list(lens))
+        return key
+
+    #  Расстановка флота из запаса: список (x, y, расположение, длина)
+    def fleet(self, size, lens):
+        with self.lock:
+            key = self._register(size, lens)
+            queue = self.fleets[key]
+            fleet = queue.popleft() if queue else None
+            if len(queue) < self.low_water:
+                self.lock.notify()
+        if fleet is None:
+            self.misses += 1
+            return FleetGenerator.get(size, lens).fleet()
+        self.hits += 1
+        return list(fleet)
+
+    #  Доска с расставленным флотом, готовая к началу игры
+    def board(self, size, lens, board_cls=BitBoard):
+        return FleetGenerator.get(size, lens).board(self.fleet(size, lens), board_cls)
+
+    #  Фоновое пополнение: доски с запасом ниже low_water пополняются до capacity
+    def _refill(self):
+        while True:
+            with self.lock:
+                while not self.closed and not self._hungry():
+                    self.lock.wait()
+                if self.closed:
+                    return
+                key = self._hungry()
+                size, lens = self.specs[key]
+                count = min(BATCH, self.capacity - len(self.fleets[key]))
+            try:
+                fleets = self._generate(size, lens, count)
+            except Exception as e:
+                # Доска больше не пополняется, но остальные доски пополняются как прежде;
+                # ее доски расставляются при запросе
+                log.exception("Не удалось пополнить запас для доски %s", key)
+                with self.lock:
+                    self.failed[key] = e
+                    self.filling.discard(key)
+                continue
+            with self.lock:
+                self.fleets[key].extend(fleets)
+
+    #  Доска, запас которой надо пополнить (запас пополняется до capacity, начиная с low_water)
+    def _hungry(self):
+        for key, queue in self.fleets.items():
+            if len(queue) < self.low_water and key not in self.failed:
+                self.filling.add(key)
+        for key in list(self.filling):
+            if len(self.fleets[key]) < self.capacity:
+                return key
+            self.filling.discard(key)
+        return None
+
+    def _generate(self, size, lens, count):
+        if self.executor is None:
+            return generate_fleets(size, lens, count)
+        return self.executor.submit(generate_fleets, size, lens, count, random.getrandbits(64)).result()
+
+    #  Запись запаса в файл: ключ доски -> размер, корабли и расстановки.
+    #  Доски, для которых расстановки считать не удалось, не записываются, чтобы не повторять ошибку при запуске.
+    def save(self, path=None):
+        path = path or self.path
+        with self.lock:
+            data = {key: {"size": board_dims(self.specs[key][0]), "ships": self.specs[key][1],
+                          "fleets": list(queue)}
+                    for key, queue in self.fleets.items() if key not in self.failed}
+        temporary = f"{path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(temporary, path)
+
+    #  Чтение запаса из файла; в запас каждой доски берется не больше capacity расстановок
+    def load(self, path):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        with self.lock:
+            for entry in data.values():
+                rows, cols = entry["size"]
+                key = self._register(rows if rows == cols else (rows, cols), entry["ships"])
+                queue = self.fleets[key]
+                room = max(self.capacity - len(queue), 0)
+                queue.extend(tuple(map(tuple, fleet)) for fleet in entry["fleets"][:room])
+            self.lock.notify()
+
+    #  Остановка пополнения; если задан файл, запас сохраняется в него
+    def close(self):
+        with self.lock:
+            self.closed = True
+            self.lock.notify()
+        self.thread.join()
+        if self.executor is not None:
+            self.executor.shutdown()
+        if self.path:
+            self.save()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
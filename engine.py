@@ -0,0 +1,841 @@
+import json
+import os
+import struct
+from array import array
+from contextlib import contextmanager
+from random import randint, sample
+
+# Ядро игры: состояние досок, расстановка флота и игроки без ввода-вывода.
+# Модуль не импортирует colorama и ничего не выполняет при импорте, вывод в терминал - в terminal.py.
+
+# Файл с вариантами игры: размеры доски и набор кораблей
+VARIANTS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "variants.json")
+
+# Результаты выстрела, о которых сообщает доска
+MISS = 0  # Промах
+HIT = 1  # Корабль поврежден
+SUNK = 2  # Корабль уничтожен
+
+
+#  Общий класс для всех исключений
+class AllException(Exception):
+    pass
+
+
+class BoardOutException(AllException):
+    def __str__(self):
+        return "⚡ Вы выстрелили в клетку за пределами поля. Повторите выстрел"
+
+
+class PreviouslyShotCellException(AllException):
+    def __str__(self):
+        return "⚡ Вы ранее стреляли в эту клетку на поле. Повторите выстрел"
+
+
+#  Исключение, когда рандомно не удается разместить все корабли на поле
+class ShipOutBoardException(AllException):
+    def __str__(self):
+        return "Корабль размещен за пределами поля"
+
+
+#  Исключение, когда флот невозможно разместить на поле ни одним способом
+class FleetPlacementException(AllException):
+    def __str__(self):
+        return "⚡ Корабли невозможно разместить на поле"
+
+
+#  Размеры поля (строки, столбцы): size - число для квадратной доски или пара (строки, столбцы)
+def board_dims(size):
+    if isinstance(size, int):
+        return size, size
+    rows, cols = size
+    return rows, cols
+
+
+#  Список длин кораблей в зависимости от размера поля
+def ships_lens(size):
+    if board_dims(size) == (10, 10):
+        return [4, 3, 3, 2, 2, 2, 1, 1, 1, 1]
+    return [3, 2, 2, 1, 1, 1, 1]  # Создаем возможность большего выбора размещения корабле
+
+
+#  Ключ доски и набора кораблей, например "10x10:4,3,3,2,2,2,1,1,1,1"
+#  (ключ запаса расстановок и книги дебютов)
+def fleet_key(size, lens):
+    rows, cols = board_dims(size)
+    return f"{rows}x{cols}:" + ",".join(str(length) for length in sorted(lens, reverse=True))
+
+
+#  Варианты игры из файла настроек: список словарей с ключами name, rows, cols, ships
+def load_variants(path=None):
+    with open(path or VARIANTS_FILE, encoding="utf-8") as f:
+        variants = json.load(f)["variants"]
+    for variant in variants:
+        rows, cols, ships = variant["rows"], variant["cols"], variant["ships"]
+        if not (isinstance(rows, int) and isinstance(cols, int) and rows > 0 and cols > 0):
+            raise ValueError(f"Неверный размер доски в варианте {variant['name']}")
+        if not ships or not all(isinstance(length, int) and 0 < length <= max(rows, cols) for length in ships):
+            raise ValueError(f"Неверный набор кораблей в варианте {variant['name']}")
+        # Флот, который не расставить, остановил бы игру при создании доски. Сначала быстрая оценка:
+        # в квадрате 2x2 могут быть клетки только одного корабля, а корабль длины L задевает (L + 1) // 2
+        # квадратов. Затем пробная расстановка, время которой ограничено FleetGenerator.
+        squares = (rows + 1) // 2 * ((cols + 1) // 2)
+        try:
+            if sum((length + 1) // 2 for length in ships) > squares:
+                raise FleetPlacementException()
+            FleetGenerator.get(variant_size(variant), ships).fleet()
+        except FleetPlacementException:
+            raise ValueError(f"Корабли варианта {variant['name']} невозможно расставить на доске")
+    return variants
+
+
+#  Проверка, что игрок класса player_cls может играть на доске size; иначе ValueError
+def check_board(player_cls, size):
+    rows, cols = board_dims(size)
+    if player_cls.max_cells is not None and rows * cols > player_cls.max_cells:
+        raise ValueError(f"{player_cls.__name__} не играет на доске {rows}x{cols}: "
+                         f"больше {player_cls.max_cells} клеток")
+
+
+#  Размер доски варианта игры: число для квадратной доски, иначе пара (строки, столбцы)
+def variant_size(variant):
+    if variant["rows"] == variant["cols"]:
+        return variant["rows"]
+    return variant["rows"], variant["cols"]
+
+
+class Dot:
+    #  Точки на поле
+    #  Класс для обозначения точек в игре.
+    #  Точка неизменяемая и хешируемая, точки поля создаются один раз и переиспользуются.
+    __slots__ = ("x", "y")
+
+    _interned = {}  # Уже созданные точки поля по координатам
+    _grids = {}  # Точки поля по размеру доски
+
+    def __new__(cls, x, y):
+        d = cls._interned.get((x, y))
+        if d is None:
+            d = object.__new__(cls)
+            object.__setattr__(d, "x", x)
+            object.__setattr__(d, "y", y)
+        return d
+
+    #  Все точки поля rows x cols (по умолчанию квадратного): grid(rows, cols)[x][y]
+    @classmethod
+    def grid(cls, rows, cols=None):
+        if cols is None:
+            cols = rows
+        grid = cls._grids.get((rows, cols))
+        if grid is None:
+            grid = tuple(tuple(cls(x, y) for y in range(cols)) for x in range(rows))
+            for row in grid:
+                for d in row:
+                    cls._interned.setdefault((d.x, d.y), d)
+            cls._grids[rows, cols] = grid
+        return grid
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Dot нельзя изменить")
+
+    def __reduce__(self):
+        return Dot, (self.x, self.y)
+
+    #  Проверка произведен ли выстрел в эту же точку или размещен корабль
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if not isinstance(other, Dot):
+            return NotImplemented
+        return self.x == other.x and self.y == other.y
+
+    def __hash__(self):
+        return hash((self.x, self.y))
+
+    #  Для отображения если точка в списке
+    def __repr__(self):
+        return f"Dot({self.x}, {self.y})"
+
+
+class Ship:
+    #  Клетки корабля и его ареал вычисляются один раз при создании
+    __slots__ = ("bow", "length", "orientation", "lives", "dots", "cells", "contour")
+
+    def __init__(self, bow, length, orientation=0):
+        self.bow = bow  # Координаты носа корабля
+        self.length = length  # Длина корабля
+        self.orientation = orientation  # 0 - горизонтальное, 1 - вертикальное
+        self.lives = length  # Жизнь корабля
+
+        #   Все точки корабля
+        dx = 1 if orientation == 1 else 0
+        dy = 1 if orientation == 0 else 0
+        self.dots = tuple(Dot(bow.x + i * dx, bow.y + i * dy) for i in range(length))
+        self.cells = frozenset(self.dots)
+        #   Точки вокруг корабля (без учета границ поля): прямоугольник на клетку шире корабля
+        end_x = bow.x + (length - 1) * dx
+        end_y = bow.y + (length - 1) * dy
+        self.contour = tuple(Dot(ax, ay)
+                             for ax in range(bow.x - 1, end_x + 2)
+                             for ay in range(bow.y - 1, end_y + 2)
+                             if not (bow.x <= ax <= end_x and bow.y <= ay <= end_y))
+
+    # Проверка попадания выстрелом по кораблю т.е попали ли нет в корабль
+    def hit(self, shot):
+        return shot in self.cells
+
+
+class BitBoard:
+    # Доска: состояние клеток хранится в плоском bytearray битовыми флагами,
+    # а для каждой клетки записан номер корабля.
+    # Выстрел и проверка размещения корабля выполняются за O(1) на клетку без перебора списков.
+    # Отрисовка и сообщения о выстрелах - в terminal.ConsoleBoard.
+
+    # Битовые флаги состояния клетки
+    SHIP = 1  # В клетке стоит корабль
+    SHOT = 2  # В клетку стреляли
+    AREA = 4  # Ареал корабля (занято при расстановке)
+    MARK = 8  # Ареал уничтоженного корабля (занято во время игры)
+
+    # Флаги, при которых клетка считается занятой
+    BUSY = SHOT | AREA | MARK
+    # Таблица для bytes.translate, оставляющая в клетке только флаг корабля
+    KEEP_SHIPS = bytes(range(2)) * 128
+
+    # Точки поля создаются заранее только для досок не больше этого кол-ва клеток
+    GRID_LIMIT = 10000
+
+    # Заголовок снимка состояния: кол-во уничтоженных кораблей, занятых клеток и выстрелов
+    STATE = struct.Struct("<III")
+    # Заголовок доски в байтах: строки, столбцы, кол-во кораблей; затем корабли: нос, длина, расположение
+    LAYOUT = struct.Struct("<III")
+    SHIP_LAYOUT = struct.Struct("<IIB")
+
+    def __init__(self, hid=False, size=6, quiet=False):
+        self.size = size  # Размер игровой доски по умолчанию 6х6, для прямоугольной - (строки, столбцы)
+        self.rows, self.cols = board_dims(size)
+        self.hid = hid  # Скрывать корабли при отрисовке
+        self.quiet = quiet  # Не выводить сообщения о результате выстрела
+
+        cells = self.rows * self.cols
+        self.count_destroy_ships = 0  # Кол-во уничтоженных кораблей
+        self.cells = bytearray(cells)  # Состояние клеток поля
+        self.cell_ship = array("i", [-1]) * cells  # Номер корабля в клетке, -1 если корабля нет
+        self.busy_count = 0  # Кол-во занятых клеток
+        self.ships = []  # Список кораблей доски
+        self.history = []  # Номера клеток, в которые стреляли, по порядку
+        if cells <= self.GRID_LIMIT:
+            Dot.grid(self.rows, self.cols)
+
+    #  Проверка выходит ли корабль или произведен ли выстрел за пределы игрового поля
+    def out(self, d):
+        return not ((0 <= d.x < self.rows) and (0 <= d.y < self.cols))
+
+    #  Номер клетки в плоском массиве
+    def index(self, d):
+        return d.x * self.cols + d.y
+
+    #  Помечаем клетку занятой флагом flag, если она еще не была занята
+    def _occupy(self, i, flag):
+        if not self.cells[i] & self.BUSY:
+            self.busy_count += 1
+        self.cells[i] |= flag
+
+    #  Ареал вокруг корабля, чтобы рядом нельзя ставить другие корабли
+    def contour(self, ship, verb=False):
+        # Во время игры ареал уничтоженного корабля помечается отдельным флагом
+        flag = self.MARK if verb else self.AREA
+        rows, cols = self.rows, self.cols
+        cells = self.cells
+        # Клетки корабля тоже занимаются, чтобы при расстановке рядом не поставить другой корабль
+        for d in ship.dots + ship.contour:
+            if 0 <= d.x < rows and 0 <= d.y < cols:
+                i = d.x * cols + d.y
+                if not cells[i] & self.BUSY:
+                    self._occupy(i, flag)
+
+    #  Добавление корабля на доску
+    def add_ship(self, ship):
+        dots = ship.dots
+        for d in dots:
+            #  Проверка вылезает ли часть корабля за пределы поля или стоит ли корабль рядом с другим
+            if self.out(d) or self.cells[self.index(d)] & (self.SHIP | self.BUSY):
+                raise ShipOutBoardException()
+        number = len(self.ships)
+        for d in dots:
+            i = self.index(d)
+            #  Обозначение корабля
+            self.cells[i] |= self.SHIP
+            #  Запись номера корабля в клетке
+            self.cell_ship[i] = number
+
+        self.ships.append(ship)
+        self.contour(ship)
+
+    def shot(self, d):
+        # Если произведен выстрел за пределы поля
+        if self.out(d):
+            raise BoardOutException()
+        i = self.index(d)
+        # Если произведен выстрел по координате второй раз
+        if self.cells[i] & self.BUSY:
+            raise PreviouslyShotCellException()
+        # Запись координат выстрела
+        self._occupy(i, self.SHOT)
+        self.history.append(i)
+        # Проверка попадания выстрела в корабль
+        number = self.cell_ship[i]
+        if number >= 0:
+            ship = self.ships[number]
+            # Если попали, уменьшаем кол-во жизни корабля
+            ship.lives -= 1
+            # Проверка кол-во жизней корабля
+            if ship.lives == 0:
+                # Если уничтожен корабль, то увеличиваем счет потопленных кораблей
+                self.count_destroy_ships += 1
+                # Помечаем на поле, что вокруг потопленного корабля не может быть других кораблей.
+                self.contour(ship, verb=True)
+                self.report(SUNK)
+                return False
+            self.report(HIT)
+            # Повторить ход
+            return True
+        # Если выстрел произведен в пустую клетку, то сообщаем
+        self.report(MISS)
+        return False
+
+    #  Сообщение о результате выстрела: MISS, HIT или SUNK. Ядро ничего не выводит.
+    def report(self, result):
+        pass
+
+    # Сброс ареалов расстановки перед началом игры, корабли остаются на месте
+    def pure_busy_dots(self):
+        self.cells = bytearray(self.cells.translate(self.KEEP_SHIPS))
+        self.busy_count = 0
+
+    #  Игра заканчивается если все корабли уничтожены у одной из сторон
+    def defeat(self):
+        return self.count_destroy_ships == len(self.ships)
+
+    @property
+    def full_board(self):
+        return self.busy_count == len(self.cells)
+
+    #  Снимок состояния доски во время игры в виде неизменяемых байтов: клетки, жизни кораблей и
+    #  выстрелы. Сами корабли в снимок не входят, поэтому восстановить его можно только на этой доске
+    #  или на доске с той же расстановкой.
+    def snapshot(self):
+        lives = array("i", [ship.lives for ship in self.ships])
+        return (self.STATE.pack(self.count_destroy_ships, self.busy_count, len(self.history))
+                + bytes(self.cells) + lives.tobytes() + array("i", self.history).tobytes())
+
+    #  Возврат к снимку состояния
+    def restore(self, snapshot):
+        self._restore(snapshot)
+
+    def _restore(self, snapshot):
+        destroyed, busy, shots = self.STATE.unpack_from(snapshot)
+        start = self.STATE.size
+        end = start + len(self.cells)
+        ships = end + 4 * len(self.ships)
+        if len(snapshot) != ships + 4 * shots:
+            raise ValueError("Снимок сделан на другой доске")
+        self.cells[:] = snapshot[start:end]
+        lives = array("i")
+        lives.frombytes(snapshot[end:ships])
+        for ship, life in zip(self.ships, lives):
+            ship.lives = life
+        history = array("i")
+        history.frombytes(snapshot[ships:])
+        self.history = history.tolist()
+        self.count_destroy_ships = destroyed
+        self.busy_count = busy
+
+    #  Результаты выстрелов из history по порядку: (номер клетки, попадание, корабль уничтожен)
+    def outcomes(self):
+        hits = [0] * len(self.ships)
+        for i in self.history:
+            number = self.cell_ship[i]
+            if number < 0:
+                yield i, False, False
+            else:
+                hits[number] += 1
+                yield i, True, hits[number] == self.ships[number].length
+
+    #  Пробные ходы: после выхода из блока with доска возвращается в прежнее состояние.
+    #  Сообщения о выстрелах на время пробы отключаются.
+    @contextmanager
+    def trial(self):
+        snapshot = self.snapshot()
+        quiet = self.quiet
+        self.quiet = True
+        try:
+            yield self
+        finally:
+            self._restore(snapshot)
+            self.quiet = quiet
+
+    #  Доска целиком в байтах: размер, расстановка кораблей и снимок состояния
+    def to_bytes(self):
+        parts = [self.LAYOUT.pack(self.rows, self.cols, len(self.ships))]
+        for ship in self.ships:
+            parts.append(self.SHIP_LAYOUT.pack(self.index(ship.bow), ship.length, ship.orientation))
+        parts.append(self.snapshot())
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data, hid=False, quiet=False):
+        rows, cols, count = cls.LAYOUT.unpack_from(data)
+        board = cls(hid=hid, size=rows if rows == cols else (rows, cols), quiet=quiet)
+        pos = cls.LAYOUT.size
+        for _ in range(count):
+            cell, length, orientation = cls.SHIP_LAYOUT.unpack_from(data, pos)
+            pos += cls.SHIP_LAYOUT.size
+            board.add_ship(Ship(Dot(cell // cols, cell % cols), length, orientation))
+        board.pure_busy_dots()
+        board.restore(data[pos:])
+        return board
+
+
+#  Битовые маски клеток корабля и его ареала (вместе с самим кораблем) на поле rows x cols.
+#  Корабль должен целиком помещаться на поле.
+def ship_masks(rows, cols, x, y, orientation, length):
+    cells = 0
+    area = 0
+    for i in range(length):
+        cx, cy = x + i * orientation, y + i * (1 - orientation)
+        cells |= 1 << (cx * cols + cy)
+        for ax in range(max(cx - 1, 0), min(cx + 2, rows)):
+            for ay in range(max(cy - 1, 0), min(cy + 2, cols)):
+                area |= 1 << (ax * cols + ay)
+    return cells, area
+
+
+class FleetGenerator:
+    # Генератор случайной расстановки флота.
+    # Для небольших досок для каждой длины корабля заранее вычисляются все допустимые положения
+    # (нос, расположение) в виде битовых масок клеток корабля и его ареала. При расстановке хранится
+    # сужающийся список еще свободных положений, а в тупике выполняется возврат к предыдущему кораблю
+    # вместо перезапуска всей доски. Корабли одной длины ставятся только в порядке списка положений,
+    # чтобы не перебирать одни и те же расстановки в разном порядке. Перебор прекращается, если оставшимся
+    # кораблям заведомо не хватит квадратов 2x2 со свободными клетками (в одном квадрате не могут
+    # оказаться клетки двух кораблей), и ограничен PLACE_BUDGET опробованными положениями на каждую
+    # из PLACE_RESTARTS попыток со своим случайным порядком положений.
+    # На больших досках маски слишком велики, поэтому корабли ставятся случайными попытками
+    # по массиву занятых клеток, а если попытки не удались - выбором из всех свободных положений.
+
+    SLOTS_LIMIT = 400  # Наибольшее кол-во клеток доски, для которого вычисляются все положения
+    DRAWS = 64  # Случайных попыток поставить корабль на большой доске до перебора всех положений
+    RESTARTS = 100  # Попыток расставить флот на большой доске заново
+    PLACE_BUDGET = 500  # Наибольшее кол-во положений, опробованных за одну попытку расставить небольшую доску
+    PLACE_RESTARTS = 40  # Попыток расставить небольшую доску, каждая со своим случайным порядком положений
+
+    _cache = {}  # Генераторы по размеру поля и списку длин кораблей
+
+    def __init__(self, size, lens):
+        self.size = size
+        self.rows, self.cols = board_dims(size)
+        self.lens = sorted(lens, reverse=True)  # Сначала ставим самые длинные корабли
+        self.slots = None
+        if self.rows * self.cols <= self.SLOTS_LIMIT:
+            self.slots = {length: self._slots(length) for length in set(self.lens)}
+            # Маски квадратов 2x2, на которые разбито поле
+            self.squares = [sum(1 << (ax * self.cols + ay)
+                                for ax in range(x, min(x + 2, self.rows)) for ay in range(y, min(y + 2, self.cols)))
+                            for x in range(0, self.rows, 2) for y in range(0, self.cols, 2)]
+            # Сколько квадратов нужно кораблям с номера k: корабль длины L задевает не меньше (L + 1) // 2
+            self.need = [sum((length + 1) // 2 for length in self.lens[k:]) for k in range(len(self.lens) + 1)]
+        # Сколько кораблей каждой длины остается поставить после корабля номер k
+        self.rest = [{length: self.lens[k + 1:].count(length) for length in set(self.lens[k + 1:])}
+                     for k in range(len(self.lens))]
+
+    # Генератор для размера поля и списка длин кораблей создается один раз
+    @classmethod
+    def get(cls, size, lens):
+        key = (board_dims(size), tuple(sorted(lens, reverse=True)))
+        generator = cls._cache.get(key)
+        if generator is None:
+            generator = cls._cache[key] = cls(size, lens)
+        return generator
+
+    # Расположения корабля длины length: однопалубный в обоих расположениях занимает одну клетку
+    @staticmethod
+    def orientations(length):
+        return (0,) if length == 1 else (0, 1)
+
+    # Все положения корабля длины length: (x, y, расположение, маска корабля, маска ареала)
+    def _slots(self, length):
+        rows, cols = self.rows, self.cols
+        slots = []
+        for orientation in self.orientations(length):
+            for x in range(rows - (length - 1) * orientation):
+                for y in range(cols - (length - 1) * (1 - orientation)):
+                    slots.append((x, y, orientation) + ship_masks(rows, cols, x, y, orientation, length))
+        return slots
+
+    # Случайная расстановка флота: список (x, y, расположение, длина)
+    def fleet(self):
+        if self.slots is None:
+            fleet = self._scatter()
+        else:
+            fleet = None
+            if self._room(0) >= self.need[0]:
+                for _ in range(self.PLACE_RESTARTS):
+                    # Положения в случайном порядке: корабли ставятся в первые подходящие из них
+                    legal = {length: sample(slots, len(slots)) for length, slots in self.slots.items()}
+                    fleet = self._place(0, legal, 0, [self.PLACE_BUDGET])
+                    if fleet is not None:
+                        break
+        if fleet is None:
+            raise FleetPlacementException()
+        return fleet
+
+    # Расстановка на большой доске: blocked - клетки, занятые кораблями и их ареалом
+    def _scatter(self):
+        for _ in range(self.RESTARTS):
+            blocked = bytearray(self.rows * self.cols)
+            fleet = []
+            for length in self.lens:
+                slot = self._draw(blocked, length) or self._scan(blocked, length)
+                if slot is None:
+                    break
+                x, y, orientation = slot
+                self._block(blocked, x, y, orientation, length)
+                fleet.append((x, y, orientation, length))
+            else:
+                return fleet
+        return None
+
+    # Свободно ли положение корабля
+    def _free(self, blocked, x, y, orientation, length):
+        cols = self.cols
+        step = cols if orientation == 1 else 1
+        start = x * cols + y
+        return not any(blocked[start:start + step * length:step])
+
+    # Случайные попытки поставить корабль
+    def _draw(self, blocked, length):
+        for _ in range(self.DRAWS):
+            orientation = randint(0, 1) if length > 1 else 0
+            last_x = self.rows - 1 - (length - 1) * orientation
+            last_y = self.cols - 1 - (length - 1) * (1 - orientation)
+            if last_x < 0 or last_y < 0:
+                continue
+            x, y = randint(0, last_x), randint(0, last_y)
+            if self._free(blocked, x, y, orientation, length):
+                return x, y, orientation
+        return None
+
+    # Случайное положение из всех свободных
+    def _scan(self, blocked, length):
+        free = []
+        for orientation in self.orientations(length):
+            for x in range(self.rows - (length - 1) * orientation):
+                for y in range(self.cols - (length - 1) * (1 - orientation)):
+                    if self._free(blocked, x, y, orientation, length):
+                        free.append((x, y, orientation))
+        if not free:
+            return None
+        return free[randint(0, len(free) - 1)]
+
+    # Отметка корабля и его ареала занятыми
+    def _block(self, blocked, x, y, orientation, length):
+        rows, cols = self.rows, self.cols
+        end_x = x + (length - 1) * orientation
+        end_y = y + (length - 1) * (1 - orientation)
+        left, right = max(y - 1, 0), min(end_y + 2, cols)
+        for ax in range(max(x - 1, 0), min(end_x + 2, rows)):
+            blocked[ax * cols + left:ax * cols + right] = b"\x01" * (right - left)
+
+    #  Кол-во квадратов 2x2, в которых есть клетки не из blocked
+    def _room(self, blocked):
+        return sum(1 for square in self.squares if square & ~blocked)
+
+    # Расстановка кораблей начиная с номера k при свободных положениях legal и занятых клетках blocked.
+    # budget - список из одного числа: сколько еще положений можно опробовать в этой попытке.
+    def _place(self, k, legal, blocked, budget):
+        if k == len(self.lens):
+            return []
+        length = self.lens[k]
+        candidates = legal[length]
+        rest = self.rest[k]
+        for i, slot in enumerate(candidates):
+            budget[0] -= 1
+            if budget[0] < 0:
+                return None
+            x, y, orientation, cells, area = slot
+            if self._room(blocked | area) < self.need[k + 1]:
+                continue
+            # Оставляем только положения, не задевающие ареал нового корабля. Следующий корабль той же
+            # длины ставится только после этого положения. Если положений меньше, чем кораблей
+            # какой-то длины, то флот здесь не поставить.
+            narrowed = {}
+            for other, count in rest.items():
+                free = [s for s in (candidates[i + 1:] if other == length else legal[other]) if not s[3] & area]
+                if len(free) < count:
+                    break
+                narrowed[other] = free
+            else:
+                fleet = self._place(k + 1, narrowed, blocked | area, budget)
+                if fleet is not None:
+                    fleet.append((x, y, orientation, length))
+                    return fleet
+        # Тупик: вернуться к предыдущему кораблю
+        return None
+
+    # Поток независимых расстановок флота
+    def fleets(self, count=None):
+        made = 0
+        while count is None or made < count:
+            yield self.fleet()
+            made += 1
+
+    # Доска с расставленным флотом, готовая к началу игры
+    def board(self, fleet=None, board_cls=BitBoard):
+        if fleet is None:
+            fleet = self.fleet()
+        board = board_cls(size=self.size)
+        for x, y, orientation, length in fleet:
+            board.add_ship(Ship(Dot(x, y), length, orientation))
+        # Очистка координат размещенных кораблей, для того чтобы записывать координаты выстрелов
+        board.pure_busy_dots()
+        return board
+
+
+# Нарушения расстановки флота: (вид, номер корабля, номер другого корабля или None)
+WRONG_SHIPS = "ships"  # Длины кораблей не совпадают с набором кораблей
+BAD_SHIP = "ship"  # Расположение не 0 и не 1 или длина меньше единицы
+OUT_OF_BOARD = "out"  # Корабль выходит за пределы поля
+OVERLAP = "overlap"  # Корабли пересекаются
+TOUCH = "touch"  # Корабль стоит в ареале другого корабля
+
+
+class FleetValidator:
+    # Проверка готовой расстановки флота целиком, например присланной клиентом или прочитанной из файла.
+    # Клетки корабля и его ареал берутся из индекса битовых масок по положению корабля, поэтому
+    # проверка каждого корабля - несколько операций с целыми числами, а не обход клеток доски.
+    # Для небольших досок индекс заполняется заранее из положений FleetGenerator, для больших -
+    # по мере проверки.
+
+    _cache = {}  # Проверки по размеру поля и списку длин кораблей
+
+    def __init__(self, size, lens):
+        self.size = size
+        self.rows, self.cols = board_dims(size)
+        self.lens = sorted(lens, reverse=True)
+        self.everything = (1 << self.rows * self.cols) - 1  # Маска всех клеток поля
+        self.index = {}  # (x, y, расположение, длина) -> (маска корабля, маска ареала)
+        self.starts = {}  # Длина -> маски клеток, с которых корабль помещается горизонтально и вертикально
+        generator = FleetGenerator.get(size, lens)
+        if generator.slots is not None:
+            for length, slots in generator.slots.items():
+                for x, y, orientation, cells, area in slots:
+                    self.index[x, y, orientation, length] = cells, area
+                    # Однопалубный корабль в обоих расположениях занимает одну и ту же клетку
+                    if length == 1:
+                        self.index[x, y, 1, length] = cells, area
+
+    # Проверка создается один раз для размера поля и списка длин кораблей
+    @classmethod
+    def get(cls, size, lens):
+        key = (board_dims(size), tuple(sorted(lens, reverse=True)))
+        validator = cls._cache.get(key)
+        if validator is None:
+            validator = cls._cache[key] = cls(size, lens)
+        return validator
+
+    #  Маски клеток корабля и его ареала, None - если корабль не помещается на поле
+    def masks(self, x, y, orientation, length):
+        key = (x, y, orientation, length)
+        masks = self.index.get(key)
+        if masks is None:
+            end_x = x + (length - 1) * orientation
+            end_y = y + (length - 1) * (1 - orientation)
+            if x < 0 or y < 0 or end_x >= self.rows or end_y >= self.cols:
+                return None
+            masks = self.index[key] = ship_masks(self.rows, self.cols, x, y, orientation, length)
+        return masks
+
+    #  Все нарушения расстановки fleet - списка (x, y, расположение, длина) - за один проход
+    def violations(self, fleet):
+        result = []
+        if sorted((ship[3] for ship in fleet), reverse=True) != self.lens:
+            result.append((WRONG_SHIPS, None, None))
+        placed = []  # Корабли на поле: (номер, маска корабля, маска ареала)
+        blocked = 0  # Ареалы поставленных кораблей
+        for number, (x, y, orientation, length) in enumerate(fleet):
+            if orientation not in (0, 1) or length < 1:
+                result.append((BAD_SHIP, number, None))
+                continue
+            masks = self.masks(x, y, orientation, length)
+            if masks is None:
+                result.append((OUT_OF_BOARD, number, None))
+                continue
+            cells, area = masks
+            # Корабли, с которыми столкнулся этот, ищутся только если он задел чей-то ареал
+            if cells & blocked:
+                for other, other_cells, other_area in placed:
+                    if cells & other_cells:
+                        result.append((OVERLAP, number, other))
+                    elif cells & other_area:
+                        result.append((TOUCH, number, other))
+            placed.append((number, cells, area))
+            blocked |= area
+        return result
+
+    def valid(self, fleet):
+        return not self.violations(fleet)
+
+    #  Маска клеток, занятых кораблями fleet и их ареалом
+    def blocked(self, fleet):
+        blocked = 0
+        for x, y, orientation, length in fleet:
+            masks = self.masks(x, y, orientation, length)
+            if masks is not None:
+                blocked |= masks[1]
+        return blocked
+
+    #  Маски клеток, с которых корабль длины length помещается на поле горизонтально и вертикально
+    def _starts(self, length):
+        starts = self.starts.get(length)
+        if starts is None:
+            rows, cols = self.rows, self.cols
+            horizontal = 0
+            if length <= cols:
+                row = (1 << cols - length + 1) - 1
+                for x in range(rows):
+                    horizontal |= row << x * cols
+            vertical = (1 << max(rows - length + 1, 0) * cols) - 1
+            starts = self.starts[length] = horizontal, vertical
+        return starts
+
+    #  Есть ли хоть одно свободное положение для корабля длины length, если занято blocked.
+    #  Все положения проверяются сразу: маска свободных клеток сдвигается на клетку length - 1 раз.
+    def has_slot(self, blocked, length):
+        free = self.everything & ~blocked
+        horizontal, vertical = self._starts(length)
+        horizontal &= free
+        vertical &= free
+        for i in range(1, length):
+            if not (horizontal or vertical):
+                return False
+            horizontal &= free >> i
+            vertical &= free >> i * self.cols
+        return bool(horizontal or vertical)
+
+
+class Player:
+    # Этот класс будет родителем для классов с AI и с пользователем
+    max_cells = None  # Наибольшее кол-во клеток доски, на которой может играть игрок (None - без ограничения)
+
+    def __init__(self, my_board, enemy_board, quiet=False):
+        self.my_board = my_board
+        self.enemy_board = enemy_board
+        self.quiet = quiet  # Не выводить сообщения в терминал (для игр без интерфейса)
+
+    # метод, который «спрашивает» игрока, в какую клетку он делает выстрел.
+    def ask(self):
+        raise NotImplementedError()
+
+    # Результат выстрела в точку d: hit - попадание, sunk - корабль уничтожен.
+    # Игроки, которые запоминают ход игры, переопределяют этот метод.
+    def observe(self, d, hit, sunk):
+        pass
+
+    # Восстановление памяти игрока по выстрелам, уже сделанным по доске противника,
+    # например после загрузки сохраненной партии
+    def replay(self):
+        cols = self.enemy_board.cols
+        for i, hit, sunk in self.enemy_board.outcomes():
+            self.observe(Dot(i // cols, i % cols), hit, sunk)
+
+    # Сообщение о выбранной клетке выстрела (выводит terminal)
+    def announce(self, d):
+        pass
+
+    # Выстрел не принят доской противника (выводит terminal)
+    def report_error(self, error):
+        pass
+
+    # Последствия хода игрока
+    def move(self):
+        while True:
+            try:
+                # "Спрашиваем" координаты выстрела
+                target = self.ask()
+                self.announce(target)
+                destroyed = self.enemy_board.count_destroy_ships
+                # Выстрел
+                repeat = self.enemy_board.shot(target)
+                # Сообщаем игроку результат выстрела
+                sunk = self.enemy_board.count_destroy_ships > destroyed
+                self.observe(target, repeat or sunk, sunk)
+                # Если корабль "ранен", то повторить выстрел
+                return repeat
+            # Если выстрел за поле или по одно и той же координате, то заново стрелять
+            except AllException as e:
+                self.report_error(e)
+
+
+class AI(Player):
+    # Ходы компьютерного игрока
+    def ask(self):
+        board = self.enemy_board
+        return Dot(randint(0, board.rows - 1), randint(0, board.cols - 1))
+    # Тут добавить логику выстрела
+
+
+class BaseGame:
+    # Партия без ввода-вывода: размер доски, набор кораблей, игроки и запись партии.
+    # Наследники задают игроков и цикл ходов.
+    board_cls = BitBoard  # Класс досок партии
+
+    def __init__(self, size=6, ships=None, recorder=None):
+        self.size = size
+        self.ships = list(ships or ships_lens(size))
+        self.players = ()  # Первый и второй игрок
+        self.recorder = recorder  # Куда записываются законченные партии (records.RecordWriter)
+        self.record = None  # Запись текущей партии (records.GameRecord)
+
+    # Расставляем рандомно корабли на доске
+    def try_board(self):
+        # Генератор перебирает только допустимые положения кораблей и возвращается назад в тупике,
+        # поэтому расстановка всегда удается с первого раза
+        return FleetGenerator.get(self.size, self.ships).board(board_cls=self.board_cls)
+
+    # Доска со случайно расставленными кораблями
+    def random_board(self):
+        return self.try_board()
+
+    # Доски игроков
+    def boards(self):
+        return tuple(player.my_board for player in self.players)
+
+    # Снимок состояния партии: снимки досок игроков с длиной каждого перед ним.
+    # Память компьютерных игроков в снимок не входит.
+    def snapshot(self):
+        parts = []
+        for board in self.boards():
+            state = board.snapshot()
+            parts.append(struct.pack("<I", len(state)) + state)
+        return b"".join(parts)
+
+    def restore(self, snapshot):
+        pos = 0
+        for board in self.boards():
+            size, = struct.unpack_from("<I", snapshot, pos)
+            pos += 4
+            board.restore(snapshot[pos:pos + size])
+            pos += size
+
+    # Запись выстрела игрока player по доске board
+    def remember(self, player, board):
+        if self.record is not None:
+            self.record.shot(player, board.history[-1])
+
+    # Запись законченной партии в файл
+    def finish(self, winner):
+        if self.record is not None:
+            self.record.winner = winner
+            self.recorder.write(self.record)
+            self.recorder.flush()
@@ -0,0 +1,179 @@
+import os
+import time
+from functools import wraps
+
+from engine import AI, BaseGame, BitBoard, FleetGenerator
+
+# Замеры горячих мест движка. Включаются вызовом enable(): методы классов заменяются обертками,
+# которые считают вызовы и время. disable() возвращает исходные методы, поэтому без enable()
+# движок работает без каких-либо дополнительных затрат.
+PREFIX = "seabattle"  # Префикс имен метрик в текстовом формате Prometheus
+
+# Методы, время которых замеряется: класс и имя метода
+TIMED = [
+    (BitBoard, "shot"),
+    (BitBoard, "add_ship"),
+    (BitBoard, "contour"),
+    (BaseGame, "try_board"),
+    (BaseGame, "random_board"),
+    (FleetGenerator, "fleet"),
+]
+
+_patched = []  # Замененные методы: (класс, имя, исходный метод)
+
+
+class Metrics:
+    # Счетчики и суммарное время операций
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.calls = {}  # Операция -> кол-во вызовов
+        self.seconds = {}  # Операция -> суммарное время, секунды
+        self.longest = {}  # Операция -> самый долгий вызов, секунды
+        self.events = {}  # Событие -> кол-во
+
+    #  Вызов операции name, длившийся elapsed секунд
+    def observe(self, name, elapsed):
+        self.calls[name] = self.calls.get(name, 0) + 1
+        self.seconds[name] = self.seconds.get(name, 0.0) + elapsed
+        if elapsed > self.longest.get(name, 0.0):
+            self.longest[name] = elapsed
+
+    def count(self, name, number=1):
+        self.events[name] = self.events.get(name, 0) + number
+
+    #  Текущие значения в виде словаря
+    def snapshot(self):
+        return {
+            "timers": {
+                name: {
+                    "calls": calls,
+                    "seconds": self.seconds[name],
+                    "max_seconds": self.longest[name],
+                    "mean_us": self.seconds[name] / calls * 1e6,
+                }
+                for name, calls in sorted(self.calls.items())
+            },
+            "counters": dict(sorted(self.events.items())),
+        }
+
+    #  Текущие значения в текстовом формате Prometheus
+    def prometheus(self):
+        lines = [
+            f"# HELP {PREFIX}_calls_total Кол-во вызовов операции",
+            f"# TYPE {PREFIX}_calls_total counter",
+        ]
+        lines += [f'{PREFIX}_calls_total{{op="{name}"}} {calls}' for name, calls in sorted(self.calls.items())]
+        lines += [
+            f"# HELP {PREFIX}_seconds_total Суммарное время операции",
+            f"# TYPE {PREFIX}_seconds_total counter",
+        ]
+        lines += [f'{PREFIX}_seconds_total{{op="{name}"}} {seconds:.9f}'
+                  for name, seconds in sorted(self.seconds.items())]
+        lines += [
+            f"# HELP {PREFIX}_seconds_max Самый долгий вызов операции",
+            f"# TYPE {PREFIX}_seconds_max gauge",
+        ]
+        lines += [f'{PREFIX}_seconds_max{{op="{name}"}} {seconds:.9f}'
+                  for name, seconds in sorted(self.longest.items())]
+        lines += [
+            f"# HELP {PREFIX}_events_total Кол-во событий",
+            f"# TYPE {PREFIX}_events_total counter",
+        ]
+        lines += [f'{PREFIX}_events_total{{event="{name}"}} {count}' for name, count in sorted(self.events.items())]
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()  # Общие метрики процесса
+
+
+#  Обертка, замеряющая время метода под именем name
+def _timed(method, name):
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            metrics.observe(name, time.perf_counter() - started)
+    return wrapper
+
+
+#  Обертка хода компьютера: имя операции по классу игрока, который делает ход
+def _timed_ask(method):
+    @wraps(method)
+    def wrapper(self):
+        started = time.perf_counter()
+        try:
+            return method(self)
+        finally:
+            metrics.observe(f"{type(self).__name__}.ask", time.perf_counter() - started)
+    return wrapper
+
+
+#  Обертка, считающая события по результату метода: result_event(результат) -> имя события или None
+def _counted(method, calls, result_event):
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        result = method(*args, **kwargs)
+        metrics.count(calls)
+        event = result_event(result)
+        if event:
+            metrics.count(event)
+        return result
+    return wrapper
+
+
+def _patch(cls, name, wrapper):
+    original = cls.__dict__[name]
+    _patched.append((cls, name, original))
+    setattr(cls, name, wrapper(original))
+
+
+#  Все наследники класса, включая непрямых
+def _subclasses(cls):
+    result = [cls]
+    for sub in cls.__subclasses__():
+        result.extend(c for c in _subclasses(sub) if c not in result)
+    return result
+
+
+#  Включение замеров. Ходы замеряются у всех наследников AI, импортированных к этому моменту.
+def enable():
+    if _patched:
+        return
+    for cls, name in TIMED:
+        _patch(cls, name, lambda method, cls=cls, name=name: _timed(method, f"{cls.__name__}.{name}"))
+    # Расстановка на небольших досках: попытки поставить корабль и тупики, требующие возврата
+    _patch(FleetGenerator, "_place", lambda method: _counted(
+        method, "FleetGenerator.place_attempts",
+        lambda fleet: "FleetGenerator.place_dead_ends" if fleet is None else None))
+    # Расстановка на больших досках: неудачные случайные попытки и перезапуски всей доски
+    _patch(FleetGenerator, "_draw", lambda method: _counted(
+        method, "FleetGenerator.draws", lambda slot: "FleetGenerator.draw_misses" if slot is None else None))
+    _patch(FleetGenerator, "_scan", lambda method: _counted(
+        method, "FleetGenerator.scans", lambda slot: "FleetGenerator.restarts" if slot is None else None))
+    for cls in _subclasses(AI):
+        if "ask" in cls.__dict__:
+            _patch(cls, "ask", _timed_ask)
+
+
+#  Выключение замеров: исходные методы возвращаются на место, накопленные значения сохраняются
+def disable():
+    while _patched:
+        cls, name, original = _patched.pop()
+        setattr(cls, name, original)
+
+
+def enabled():
+    return bool(_patched)
+
+
+#  Запись метрик в файл в формате Prometheus. Файл заменяется целиком, поэтому читатель
+#  никогда не видит его наполовину записанным.
+def dump(path):
+    temporary = f"{path}.tmp"
+    with open(temporary, "w", encoding="utf-8") as f:
+        f.write(metrics.prometheus())
+    os.replace(temporary, path)
@@ -0,0 +1,176 @@
+import argparse
+import json
+import os
+import random
+
+from engine import FleetGenerator, board_dims, fleet_key, load_variants, ships_lens, variant_size
+
+# Книга дебютов: для размера доски и набора кораблей - вероятность занятости каждой клетки
+# и последовательность первых выстрелов, пока все они промахи. Вычисляется заранее этим модулем
+# (python opening_book.py) и сохраняется в файл, компьютерный игрок только читает ее.
+OPENING_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "openings.json")
+ENUMERATE_LIMIT = 49  # Наибольшее кол-во клеток доски, для которого перебираются все расстановки
+SAMPLES = 100000  # Кол-во случайных расстановок для больших досок
+OPENING_SHOTS = 10  # Длина дебюта по умолчанию
+
+_books = {}  # Прочитанные файлы книг дебютов
+
+
+class Enumeration:
+    # Перебор всех допустимых расстановок флота. Корабли одной длины неразличимы, поэтому
+    # их положения перебираются по возрастанию номера и каждая расстановка считается один раз.
+    # Для каждого положения считается, во скольких расстановках оно встречается.
+    def __init__(self, size, lens):
+        generator = FleetGenerator.get(size, lens)
+        if generator.slots is None:
+            raise ValueError("Доска слишком велика для перебора всех расстановок")
+        self.rows, self.cols = generator.rows, generator.cols
+        self.lens = generator.lens
+        self.slots = {length: [(s[3], s[4]) for s in slots] for length, slots in generator.slots.items()}
+
+    #  Кол-во расстановок, не задевающих клетки промахов misses, и кол-во расстановок,
+    #  в которых занята каждая клетка
+    def occupancy(self, misses=()):
+        self.hits = {length: [0] * len(slots) for length, slots in self.slots.items()}
+        blocked = 0
+        for i in misses:
+            blocked |= 1 << i
+        total = self._count(0, blocked, 0)
+        counts = [0] * (self.rows * self.cols)
+        for length, slots in self.slots.items():
+            for (cells, _), hits in zip(slots, self.hits[length]):
+                if hits:
+                    for i in range(len(counts)):
+                        if cells >> i & 1:
+                            counts[i] += hits
+        return total, counts
+
+    #  Кол-во расстановок кораблей с номера k: blocked - клетки, занятые ареалами и промахами,
+    #  start - первое положение, если предыдущий корабль той же длины
+    def _count(self, k, blocked, start):
+        if k == len(self.lens):
+            return 1
+        length = self.lens[k]
+        slots = self.slots[length]
+        hits = self.hits[length]
+        total = 0
+        for j in range(start if k and self.lens[k - 1] == length else 0, len(slots)):
+            cells, area = slots[j]
+            if cells & blocked:
+                continue
+            sub = self._count(k + 1, blocked | area, j + 1)
+            if sub:
+                hits[j] += sub
+                total += sub
+        return total
+
+
+class Sampling:
+    # Оценка по случайным расстановкам FleetGenerator, если перебрать все расстановки невозможно.
+    # Промахи учитываются отбрасыванием расстановок, задевающих клетки промахов.
+    def __init__(self, size, lens, samples=SAMPLES):
+        generator = FleetGenerator.get(size, lens)
+        self.rows, self.cols = generator.rows, generator.cols
+        cols = self.cols
+        self.fleets = []  # Клетки кораблей каждой расстановки
+        for fleet in generator.fleets(samples):
+            self.fleets.append([(x + k * orientation) * cols + y + k * (1 - orientation)
+                                for x, y, orientation, length in fleet for k in range(length)])
+
+    def occupancy(self, misses=()):
+        misses = set(misses)
+        counts = [0] * (self.rows * self.cols)
+        total = 0
+        for cells in self.fleets:
+            if misses.isdisjoint(cells):
+                total += 1
+                for i in cells:
+                    counts[i] += 1
+        return total, counts
+
+
+#  Запись книги для размера доски и набора кораблей: вероятности клеток до первого выстрела
+#  и дебют - каждый следующий выстрел в клетку, которая при промахах всех предыдущих
+#  занята в наибольшем числе расстановок
+def build(size, lens, shots=OPENING_SHOTS, samples=None):
+    rows, cols = board_dims(size)
+    if samples is None and rows * cols <= ENUMERATE_LIMIT:
+        method = "exhaustive"
+        source = Enumeration(size, lens)
+    else:
+        method = "sampled"
+        source = Sampling(size, lens, samples or SAMPLES)
+    total, counts = source.occupancy()
+    if not total:
+        raise ValueError("Корабли невозможно разместить на поле")
+    probability = [round(c / total, 6) for c in counts]
+    opening = []
+    while len(opening) < shots:
+        remaining, counts = source.occupancy(opening) if opening else (total, counts)
+        if not remaining:
+            break
+        opening.append(max((i for i in range(len(counts)) if i not in opening), key=counts.__getitem__))
+    return {"method": method, "fleets": total, "probability": probability, "opening": opening}
+
+
+#  Книги дебютов из файла: словарь ключ -> запись. Файл читается один раз.
+def load_book(path=None):
+    path = path or OPENING_FILE
+    book = _books.get(path)
+    if book is None:
+        try:
+            with open(path, encoding="utf-8") as f:
+                book = json.load(f)
+        except FileNotFoundError:
+            book = {}
+        _books[path] = book
+    return book
+
+
+def save_book(book, path=None):
+    path = path or OPENING_FILE
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(book, f, indent=1)
+    _books[path] = book
+
+
+#  Дебют для доски и набора кораблей: список номеров клеток или пустой список, если книги нет
+def opening(size, lens, path=None):
+    entry = load_book(path).get(fleet_key(size, lens))
+    return entry["opening"] if entry else []
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Построение книги дебютов компьютерного игрока")
+    parser.add_argument("-s", "--size", type=int, action="append", help="размер доски (по умолчанию 6)")
+    parser.add_argument("--variant", action="append", help="вариант игры из файла настроек")
+    parser.add_argument("--config", help="файл настроек с вариантами игры")
+    parser.add_argument("-n", "--shots", type=int, default=OPENING_SHOTS, help="длина дебюта")
+    parser.add_argument("--samples", type=int, help="оценивать по случайным расстановкам вместо перебора")
+    parser.add_argument("--seed", type=int, help="начальное значение генератора случайных чисел")
+    parser.add_argument("-o", "--output", help="файл книги (по умолчанию openings.json рядом с модулем)")
+    args = parser.parse_args(argv)
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    tasks = [(size, ships_lens(size)) for size in args.size or ()]
+    if args.variant:
+        variants = {v["name"]: v for v in load_variants(args.config)}
+        for name in args.variant:
+            if name not in variants:
+                parser.error(f"Нет варианта {name}")
+            tasks.append((variant_size(variants[name]), variants[name]["ships"]))
+    if not tasks:
+        tasks = [(6, ships_lens(6))]
+
+    # Новые записи добавляются к уже вычисленным
+    book = dict(load_book(args.output))
+    for size, lens in tasks:
+        key = fleet_key(size, lens)
+        entry = book[key] = build(size, lens, args.shots, args.samples)
+        print(f"{key}: {entry['method']}, расстановок {entry['fleets']}, дебют {entry['opening']}")
+    save_book(book, args.output)
+
+
+if __name__ == "__main__":
+    main()
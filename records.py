@@ -0,0 +1,162 @@
+import mmap
+import os
+
+# Формат файла записей партий:
+#   заголовок MAGIC, затем записи подряд; каждая запись - длина в байтах (varint) и сама запись:
+#   строки, столбцы,
+#   для каждого из двух игроков: кол-во кораблей и для каждого корабля
+#       номер клетки носа (x * столбцы + y) и длина * 2 + расположение,
+#   кол-во выстрелов и для каждого выстрела номер клетки * 2 + номер стрелявшего игрока,
+#   номер победителя + 1 (0 - партия не закончена).
+# Все числа записываются в формате varint: по 7 бит в байте, старший бит - признак продолжения.
+MAGIC = b"SBR1"
+
+
+#  Ошибка в файле записей партий
+class RecordFormatError(ValueError):
+    pass
+
+
+def write_varint(out, value):
+    while value > 0x7F:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+#  Чтение числа из buf с позиции pos, возвращает число и позицию после него
+def read_varint(buf, pos):
+    value = 0
+    shift = 0
+    while True:
+        try:
+            byte = buf[pos]
+        except IndexError:
+            raise RecordFormatError("Запись обрывается посреди числа")
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+class GameRecord:
+    # Запись одной партии: размер доски, расстановка флотов обоих игроков и выстрелы по порядку
+    def __init__(self, rows, cols, fleets, shots=None, winner=None):
+        self.rows = rows
+        self.cols = cols
+        self.fleets = fleets  # Два списка кораблей (x, y, расположение, длина)
+        self.shots = shots if shots is not None else []  # Выстрелы (номер игрока, номер клетки)
+        self.winner = winner  # Номер победителя или None
+
+    # Запись партии по доскам игроков: first - доска первого игрока, second - второго
+    @classmethod
+    def from_boards(cls, first, second):
+        fleets = [[(ship.bow.x, ship.bow.y, ship.orientation, ship.length) for ship in board.ships]
+                  for board in (first, second)]
+        return cls(first.rows, first.cols, fleets)
+
+    # Выстрел игрока player в клетку с номером cell доски противника
+    def shot(self, player, cell):
+        self.shots.append((player, cell))
+
+    def encode(self):
+        out = bytearray()
+        write_varint(out, self.rows)
+        write_varint(out, self.cols)
+        for fleet in self.fleets:
+            write_varint(out, len(fleet))
+            for x, y, orientation, length in fleet:
+                write_varint(out, x * self.cols + y)
+                write_varint(out, length << 1 | orientation)
+        write_varint(out, len(self.shots))
+        for player, cell in self.shots:
+            write_varint(out, cell << 1 | player)
+        write_varint(out, 0 if self.winner is None else self.winner + 1)
+        return bytes(out)
+
+    @classmethod
+    def decode(cls, buf):
+        rows, pos = read_varint(buf, 0)
+        cols, pos = read_varint(buf, pos)
+        if not cols:
+            raise RecordFormatError("Нулевое кол-во столбцов")
+        fleets = []
+        for _ in range(2):
+            count, pos = read_varint(buf, pos)
+            fleet = []
+            for _ in range(count):
+                cell, pos = read_varint(buf, pos)
+                value, pos = read_varint(buf, pos)
+                fleet.append((cell // cols, cell % cols, value & 1, value >> 1))
+            fleets.append(fleet)
+        count, pos = read_varint(buf, pos)
+        shots = []
+        for _ in range(count):
+            value, pos = read_varint(buf, pos)
+            shots.append((value & 1, value >> 1))
+        winner, pos = read_varint(buf, pos)
+        return cls(rows, cols, fleets, shots, winner - 1 if winner else None)
+
+    def __repr__(self):
+        return f"GameRecord({self.rows}x{self.cols}, shots={len(self.shots)}, winner={self.winner})"
+
+
+class RecordWriter:
+    # Запись партий в конец файла по мере их завершения
+    def __init__(self, path):
+        self.file = open(path, "ab")
+        if self.file.tell() == 0:
+            self.file.write(MAGIC)
+
+    def write(self, record):
+        payload = record.encode()
+        size = bytearray()
+        write_varint(size, len(payload))
+        self.file.write(size + payload)
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+#  Чтение партий из файла по одной. Файл отображается в память и не загружается целиком.
+def read_records(path):
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            if buf[:len(MAGIC)] != MAGIC:
+                raise RecordFormatError("Это не файл записей партий")
+            pos = len(MAGIC)
+            end = len(buf)
+            while pos < end:
+                size, pos = read_varint(buf, pos)
+                if pos + size > end:
+                    raise RecordFormatError("Последняя запись обрывается")
+                yield GameRecord.decode(buf[pos:pos + size])
+                pos += size
+
+
+#  Повтор партии: выдает (игрок, точка, результат выстрела, доска, по которой стреляли) после каждого выстрела.
+#  Результат - то, что вернул BitBoard.shot (True, если игрок ходит еще раз).
+def replay(record):
+    # Движок импортируется только здесь: запись и чтение файлов обходятся без него
+    from engine import Dot, FleetGenerator
+
+    generator = FleetGenerator.get((record.rows, record.cols), [ship[3] for ship in record.fleets[0]])
+    boards = [generator.board(fleet) for fleet in record.fleets]
+    for board in boards:
+        board.quiet = True
+    for player, cell in record.shots:
+        board = boards[1 - player]
+        d = Dot(cell // record.cols, cell % record.cols)
+        yield player, d, board.shot(d), board
@@ -0,0 +1,629 @@
+import argparse
+import asyncio
+import os
+import secrets
+import struct
+import time
+
+import instrumentation
+from board_pool import BoardPool
+from engine import (AI, AllException, BitBoard, BoardOutException, Dot, FleetGenerator, FleetValidator, Player,
+                    PreviouslyShotCellException, Ship, ShipOutBoardException, ships_lens)
+from records import GameRecord, RecordWriter
+from strategies import DensityAI, HuntTargetAI
+
+# Протокол: одна команда в строке, ответы сервера тоже построчно.
+#   NEW <размер> AI|PVP  - новая игра с компьютером или с другим игроком
+#   RESUME <ключ>        - продолжить прерванную игру с компьютером по ключу из строки GAME
+#   RANDOM               - расставить корабли случайно
+#   PLACE x y r          - поставить очередной корабль: нос x y, расположение r (0 или 1)
+#   FLEET x y r ...      - поставить сразу все корабли в порядке команд SHIP: по три числа на корабль
+#   SHOT x y             - выстрел
+#   BOARD                - показать доски
+#   QUIT                 - выйти
+HELP = [
+    "NEW <6|10> AI|PVP",
+    "RESUME key",
+    "RANDOM",
+    "PLACE x y r",
+    "FLEET x y r ...",
+    "SHOT x y",
+    "BOARD",
+    "QUIT",
+]
+
+SIZES = (6, 10)  # Допустимые размеры доски
+CHECKPOINT_SUFFIX = ".chk"  # Расширение файлов сохранения игр с компьютером
+CHECKPOINT_TTL = 7 * 24 * 3600  # Сколько секунд хранится сохранение брошенной игры
+CHECKPOINT_SWEEP = 3600  # Как часто удаляются устаревшие сохранения, секунды
+
+# Обозначения клеток в текстовом протоколе
+PLAIN_HIT = "X"
+PLAIN_MISS = "*"
+PLAIN_MARK = "-"
+PLAIN_SHIP = "O"
+PLAIN_EMPTY = "."
+
+
+#  Клиент закрыл соединение или долго не отвечал
+class ClientGone(Exception):
+    def __init__(self, conn):
+        super().__init__()
+        self.conn = conn  # Соединение, которое было потеряно
+
+
+class Connection:
+    # Соединение с клиентом: отправка строк и чтение команд
+    def __init__(self, reader, writer, timeout=None):
+        self.reader = reader
+        self.writer = writer
+        self.timeout = timeout  # Сколько секунд ждать команду клиента
+
+    async def send(self, *lines):
+        for line in lines:
+            self.writer.write(line.encode() + b"\n")
+        try:
+            await self.writer.drain()
+        except ConnectionError:
+            raise ClientGone(self)
+
+    # Следующая команда клиента: имя команды в верхнем регистре и список аргументов
+    async def command(self):
+        while True:
+            try:
+                line = await asyncio.wait_for(self.reader.readline(), self.timeout)
+            except (asyncio.TimeoutError, ConnectionError, asyncio.LimitOverrunError, ValueError):
+                raise ClientGone(self)
+            if not line:
+                raise ClientGone(self)
+            words = line.decode(errors="replace").split()
+            if not words:
+                continue
+            command = words[0].upper()
+            if command == "QUIT":
+                raise ClientGone(self)
+            return command, words[1:]
+
+    def close(self):
+        self.writer.close()
+
+
+#  Доска в виде текста без цветов
+def plain(board, hid=False):
+    cols = board.cols
+    lines = ["   " + " ".join(str(y + 1) for y in range(cols))]
+    for x in range(board.rows):
+        row = []
+        for flags in board.cells[x * cols:(x + 1) * cols]:
+            if flags & board.SHOT:
+                row.append(PLAIN_HIT if flags & board.SHIP else PLAIN_MISS)
+            elif flags & board.MARK:
+                row.append(PLAIN_MARK)
+            elif flags & board.SHIP and not hid:
+                row.append(PLAIN_SHIP)
+            else:
+                row.append(PLAIN_EMPTY)
+        lines.append(f"{x + 1:<2} " + " ".join(row))
+    return lines
+
+
+#  Разбор целых чисел из аргументов команды
+def numbers(args, count):
+    if len(args) != count or not all(a.isdigit() for a in args):
+        return None
+    return [int(a) for a in args]
+
+
+class AsyncPlayer:
+    # Асинхронный ход игрока: то же, что Player.move, но выбор клетки может ждать ввода по сети.
+    # Возвращает клетку выстрела, признак повтора хода и признак уничтожения корабля.
+    async def move(self):
+        while True:
+            target = await self.ask_async()
+            destroyed = self.enemy_board.count_destroy_ships
+            try:
+                repeat = self.enemy_board.shot(target)
+            except AllException as e:
+                await self.rejected(e)
+                continue
+            sunk = self.enemy_board.count_destroy_ships > destroyed
+            self.observe(target, repeat or sunk, sunk)
+            return target, repeat, sunk
+
+    async def ask_async(self):
+        return self.ask()
+
+    #  Выстрел не принят доской противника
+    async def rejected(self, error):
+        pass
+
+    #  Сообщение игроку
+    async def notify(self, *lines):
+        pass
+
+
+class RemoteUser(AsyncPlayer, Player):
+    # Игрок, подключенный по сети
+    def __init__(self, my_board, enemy_board, conn):
+        super().__init__(my_board, enemy_board, quiet=True)
+        self.conn = conn
+
+    async def ask_async(self):
+        await self.conn.send("TURN")
+        while True:
+            command, args = await self.conn.command()
+            if command == "SHOT":
+                cords = numbers(args, 2)
+                if cords is None:
+                    await self.conn.send("ERR SHOT x y")
+                    continue
+                # Возвращаем координаты выстрела с корректировкой (игровое поле начинается с 1, а индексы с 0)
+                return Dot(cords[0] - 1, cords[1] - 1)
+            if command == "BOARD":
+                await self.show_boards()
+            else:
+                await self.conn.send("ERR your turn: SHOT x y")
+
+    async def rejected(self, error):
+        if isinstance(error, BoardOutException):
+            await self.conn.send("ERR OUT")
+        elif isinstance(error, PreviouslyShotCellException):
+            await self.conn.send("ERR REPEAT")
+        else:
+            await self.conn.send("ERR")
+
+    async def notify(self, *lines):
+        await self.conn.send(*lines)
+
+    async def show_boards(self):
+        await self.conn.send("MY", *plain(self.my_board), "ENEMY", *plain(self.enemy_board, hid=True), "END")
+
+
+class ServerAI(AsyncPlayer, DensityAI):
+    # Компьютерный игрок сервера
+    pass
+
+
+class ServerHuntAI(AsyncPlayer, HuntTargetAI):
+    # Дешевый компьютерный игрок сервера для большого числа партий
+    pass
+
+
+class ServerRandomAI(AsyncPlayer, AI):
+    # Компьютерный игрок сервера, стреляющий наугад
+    pass
+
+
+class ServerGame:
+    # Одна партия на сервере. Правила ходов те же, что и в Game.loop:
+    # при попадании без уничтожения корабля игрок ходит еще раз.
+    # Если задан path, после каждого хода партия сохраняется в этот файл, а после окончания файл удаляется.
+    def __init__(self, first, second, recorder=None, path=None):
+        self.players = (first, second)
+        self.num = 0  # Номер хода: по четным ходит первый игрок, по нечетным второй
+        self.path = path  # Файл сохранения партии
+        self.finished = False  # Партия закончена и записана
+        # Запись партии, если на сервере включено сохранение партий
+        self.recorder = recorder
+        self.record = None if recorder is None else GameRecord.from_boards(first.my_board, second.my_board)
+
+    async def play(self):
+        try:
+            return await self.turns()
+        except (ClientGone, asyncio.CancelledError):
+            # Партия прервана: уход клиента или остановка сервера. Она тоже записывается, без победителя.
+            if not self.finished:
+                self.finish(None)
+            raise
+
+    async def turns(self):
+        while True:
+            num = self.num
+            player = self.players[num % 2]
+            enemy = self.players[(num + 1) % 2]
+            target, repeat, sunk = await player.move()
+            if self.record is not None:
+                self.record.shot(num % 2, player.enemy_board.index(target))
+            result = "SUNK" if sunk else "HIT" if repeat else "MISS"
+            cords = f"{target.x + 1} {target.y + 1}"
+            await player.notify(f"{result} {cords}")
+            await enemy.notify(f"ENEMY {result} {cords}")
+            # Проверяется все ли корабли уничтожены у противника
+            if player.enemy_board.defeat():
+                self.finish(num % 2)
+                if self.path is not None and os.path.exists(self.path):
+                    os.remove(self.path)
+                await player.notify("WIN")
+                await enemy.notify("LOSE")
+                return player
+            if not repeat:
+                self.num += 1
+            if self.path is not None:
+                self.save()
+
+    #  Запись партии в файл сразу после ее окончания: winner - номер победителя, None - партия прервана
+    def finish(self, winner):
+        self.finished = True
+        if self.record is not None:
+            self.record.winner = winner
+            self.recorder.write(self.record)
+            self.recorder.flush()
+
+    # Сохранение сессии: номер хода и обе доски целиком (размер, корабли, выстрелы)
+    def checkpoint(self):
+        parts = [struct.pack("<I", self.num)]
+        for player in self.players:
+            data = player.my_board.to_bytes()
+            parts.append(struct.pack("<I", len(data)) + data)
+        return b"".join(parts)
+
+    #  Ключ сохранения партии, по которому клиент может ее продолжить
+    @property
+    def token(self):
+        return os.path.basename(self.path)[:-len(CHECKPOINT_SUFFIX)]
+
+    #  Запись сохранения в файл path. Файл заменяется целиком, поэтому после сбоя в нем остается
+    #  последнее полностью записанное сохранение.
+    def save(self):
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "wb") as f:
+            f.write(self.checkpoint())
+        os.replace(temporary, self.path)
+
+    # Партия из сохранения сессии. first и second создают игроков по их доске и доске противника:
+    # first(my_board, enemy_board). Игроки вспоминают уже сделанные выстрелы через Player.replay,
+    # а запись партии восстанавливается по выстрелам на досках.
+    @classmethod
+    def load_checkpoint(cls, data, first, second, recorder=None, path=None):
+        num, = struct.unpack_from("<I", data)
+        pos = 4
+        boards = []
+        for _ in range(2):
+            size, = struct.unpack_from("<I", data, pos)
+            pos += 4
+            boards.append(BitBoard.from_bytes(data[pos:pos + size], quiet=True))
+            pos += size
+        game = cls(first(boards[0], boards[1]), second(boards[1], boards[0]), recorder, path)
+        game.num = num
+        for player in game.players:
+            player.replay()
+        if game.record is not None:
+            # Выстрелы игроков по очереди: ход переходит после промаха или уничтожения корабля
+            outcomes = [list(boards[1].outcomes()), list(boards[0].outcomes())]
+            turn = 0
+            done = [0, 0]
+            while done[turn] < len(outcomes[turn]):
+                i, hit, sunk = outcomes[turn][done[turn]]
+                done[turn] += 1
+                game.record.shot(turn, i)
+                if not hit or sunk:
+                    turn = 1 - turn
+        return game
+
+
+class Server:
+    # Сервер морского боя: каждая партия - отдельная сессия в одном цикле событий
+    def __init__(self, ai=ServerAI, timeout=None, recorder=None, pool=None, checkpoints=None,
+                 checkpoint_ttl=CHECKPOINT_TTL):
+        self.ai = ai  # Класс компьютерного игрока
+        self.timeout = timeout  # Сколько секунд ждать команду клиента
+        self.recorder = recorder  # Запись законченных партий в файл
+        self.pool = pool  # Запас готовых расстановок флота
+        self.checkpoints = checkpoints  # Каталог сохранений игр с компьютером (None - не сохранять)
+        # Сохранение прерванной игры удаляется, если ее не продолжили за checkpoint_ttl секунд
+        self.checkpoint_ttl = checkpoint_ttl
+        self.playing = set()  # Файлы сохранений идущих партий: одну партию нельзя продолжить дважды
+        if checkpoints is not None:
+            self.expire_checkpoints()
+        if pool is not None:
+            for size in SIZES:
+                pool.warm(size, ships_lens(size))
+        # Игроки, ожидающие соперника: размер доски -> [соединение, доска, future конца партии, чтение соединения]
+        self.waiting = {}
+        self.sessions = 0  # Кол-во идущих партий
+
+    async def handle(self, reader, writer):
+        conn = Connection(reader, writer, self.timeout)
+        try:
+            await conn.send("WELCOME", *HELP)
+            while True:
+                await self.session(conn)
+        except ClientGone:
+            pass
+        finally:
+            conn.close()
+
+    #  Одна партия клиента
+    async def session(self, conn):
+        size, mode, game = await self.new_game(conn)
+        if mode == "PVP":
+            board = await self.setup_board(conn, size)
+            await self.pvp(conn, size, board)
+            return
+        if game is None:
+            board = await self.setup_board(conn, size)
+            enemy = self.random_board(size, ships_lens(size))
+            board.quiet = enemy.quiet = True
+            user = RemoteUser(board, enemy, conn)
+            path = None if self.checkpoints is None else self.checkpoint_path(secrets.token_hex(8))
+            game = ServerGame(user, self.ai(enemy, board, quiet=True), self.recorder, path)
+        else:
+            await game.players[0].show_boards()
+        # Ключ, по которому клиент может продолжить игру, если соединение прервется
+        if game.path is None:
+            await self.run(game)
+            return
+        # Сохранение есть еще до первого хода, чтобы ключ сразу можно было использовать в RESUME
+        game.save()
+        await conn.send(f"GAME {game.token}")
+        self.playing.add(game.path)
+        try:
+            await self.run(game)
+        finally:
+            self.playing.discard(game.path)
+
+    #  Удаление сохранений игр, которые не продолжали дольше checkpoint_ttl секунд.
+    #  Возвращает кол-во удаленных файлов.
+    def expire_checkpoints(self):
+        oldest = time.time() - self.checkpoint_ttl
+        removed = 0
+        for entry in os.scandir(self.checkpoints):
+            if not entry.name.endswith(CHECKPOINT_SUFFIX) or entry.path in self.playing:
+                continue
+            try:
+                if entry.stat().st_mtime < oldest:
+                    os.remove(entry.path)
+                    removed += 1
+            except OSError:
+                # Файл могли удалить или продолжить игру одновременно с проверкой
+                pass
+        return removed
+
+    #  Файл сохранения игры с ключом token
+    def checkpoint_path(self, token):
+        return os.path.join(self.checkpoints, f"{token}{CHECKPOINT_SUFFIX}")
+
+    #  Размер доски и режим новой игры; для RESUME - еще и продолженная игра
+    async def new_game(self, conn):
+        while True:
+            command, args = await conn.command()
+            if command == "RESUME":
+                game = self.resume(conn, args)
+                if game is None:
+                    await conn.send("ERR RESUME")
+                    continue
+                return game.players[0].my_board.size, "RESUME", game
+            if command != "NEW" or len(args) != 2:
+                await conn.send("ERR NEW <6|10> AI|PVP")
+                continue
+            size, mode = args[0], args[1].upper()
+            if not size.isdigit() or int(size) not in SIZES or mode not in ("AI", "PVP"):
+                await conn.send("ERR NEW <6|10> AI|PVP")
+                continue
+            return int(size), mode, None
+
+    #  Расстановка кораблей клиентом: случайно, всем флотом сразу или по одному кораблю
+    async def setup_board(self, conn, size):
+        lens = ships_lens(size)
+        validator = FleetValidator.get(size, lens)
+        await conn.send("SETUP RANDOM|FLEET|PLACE")
+        board = BitBoard(size=size, quiet=True)
+        fleet = []  # Поставленные корабли: (x, y, расположение, длина)
+        k = 0
+        while k < len(lens):
+            await conn.send(f"SHIP {lens[k]}")
+            command, args = await conn.command()
+            if command == "RANDOM":
+                board = self.random_board(size, lens)
+                board.quiet = True
+                break
+            if command == "FLEET":
+                uploaded, error = self.uploaded_fleet(args, lens, validator)
+                if error:
+                    await conn.send(error)
+                    continue
+                board = FleetGenerator.get(size, lens).board(uploaded)
+                board.quiet = True
+                break
+            if command != "PLACE":
+                await conn.send("ERR RANDOM, FLEET x y r ... or PLACE x y r")
+                continue
+            parameters = numbers(args, 3)
+            if parameters is None or parameters[2] not in (0, 1):
+                await conn.send("ERR PLACE x y r")
+                continue
+            x, y, r = parameters
+            try:
+                board.add_ship(Ship(Dot(x - 1, y - 1), lens[k], r))
+            except ShipOutBoardException:
+                await conn.send("ERR SHIP")
+                continue
+            fleet.append((x - 1, y - 1, r, lens[k]))
+            k += 1
+            # Если некуда поставить следующий корабль, то начинаем расстановку заново
+            if k < len(lens) and not validator.has_slot(validator.blocked(fleet), lens[k]):
+                await conn.send("ERR FULL")
+                board = BitBoard(size=size, quiet=True)
+                fleet = []
+                k = 0
+        else:
+            # Очистка координат размещенных кораблей, для того чтобы записывать координаты выстрелов
+            board.pure_busy_dots()
+        await conn.send("READY", *plain(board))
+        return board
+
+    #  Флот из аргументов команды FLEET: корабли в порядке lens, по три числа x y r на корабль.
+    #  Возвращает флот и строку ошибки; в ошибке перечислены сразу все нарушения:
+    #  "ERR FLEET вид:корабль[:другой корабль] ...", корабли нумеруются с единицы.
+    @staticmethod
+    def uploaded_fleet(args, lens, validator):
+        parameters = numbers(args, 3 * len(lens))
+        if parameters is None:
+            return None, f"ERR FLEET x y r ... ({len(lens)} ships)"
+        fleet = [(x - 1, y - 1, r, length) for (x, y, r), length in zip(zip(*[iter(parameters)] * 3), lens)]
+        violations = validator.violations(fleet)
+        if not violations:
+            return fleet, None
+        return None, "ERR FLEET " + " ".join(
+            ":".join([kind] + [str(ship + 1) for ship in (number, other) if ship is not None])
+            for kind, number, other in violations)
+
+    #  Прерванная игра с компьютером по ключу из аргументов команды RESUME, None - если ее нет
+    def resume(self, conn, args):
+        if self.checkpoints is None or len(args) != 1 or not all(c in "0123456789abcdef" for c in args[0]):
+            return None
+        path = self.checkpoint_path(args[0])
+        if path in self.playing:
+            return None
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        return ServerGame.load_checkpoint(data, lambda my, enemy: RemoteUser(my, enemy, conn),
+                                          lambda my, enemy: self.ai(my, enemy, quiet=True), self.recorder, path)
+
+    #  Доска со случайно расставленными кораблями, из запаса, если он есть
+    def random_board(self, size, lens):
+        if self.pool is not None:
+            return self.pool.board(size, lens)
+        return FleetGenerator.get(size, lens).board()
+
+    #  Игра двух клиентов: первый ждет второго с тем же размером доски
+    async def pvp(self, conn, size, board):
+        waiting = self.waiting.pop(size, None)
+        # Ожидавший клиент мог уйти, пока никто не читал его соединение
+        if waiting is not None and (waiting[0].reader.at_eof() or waiting[0].writer.is_closing()):
+            await self.release(waiting)
+            waiting = None
+        if waiting is None:
+            await self.wait_opponent(conn, size, board)
+            return
+        other_conn, other_board, done, _ = waiting
+        await self.release(waiting, paired=True)
+        first = RemoteUser(other_board, board, other_conn)
+        second = RemoteUser(board, other_board, conn)
+        try:
+            await self.run(ServerGame(first, second, self.recorder))
+        except ClientGone as gone:
+            # Соединение этого клиента живо, если ушел соперник
+            if gone.conn is conn:
+                raise
+        finally:
+            if not done.done():
+                done.set_result(None)
+
+    #  Ожидание соперника. Пока соперника нет, соединение читается: так замечается уход клиента
+    #  (и истечение timeout), а команды, кроме QUIT, отклоняются.
+    async def wait_opponent(self, conn, size, board):
+        done = asyncio.get_running_loop().create_future()  # Партия с соперником закончилась
+        watch = asyncio.ensure_future(conn.command())
+        self.waiting[size] = [conn, board, done, watch]
+        try:
+            await conn.send("WAIT")
+            while True:
+                await asyncio.wait((done, watch), return_when=asyncio.FIRST_COMPLETED)
+                if watch.cancelled():
+                    # Соперник нашелся: соединение теперь читает партия
+                    await done
+                    return
+                watch.result()  # ClientGone, если клиент ушел, прислал QUIT или долго молчал
+                await conn.send("ERR WAIT")
+                watch = self.waiting[size][3] = asyncio.ensure_future(conn.command())
+        finally:
+            if self.waiting.get(size, (None,))[0] is conn:
+                del self.waiting[size]
+            if not watch.done():
+                watch.cancel()
+
+    #  Прекращение чтения соединения ожидавшего клиента; если пары не будет, его ожидание заканчивается
+    @staticmethod
+    async def release(waiting, paired=False):
+        _, _, done, watch = waiting
+        watch.cancel()
+        # Читать соединение можно только после того, как чтение ожидания действительно прервано
+        await asyncio.wait((watch,))
+        if not paired and not done.done():
+            done.set_result(None)
+
+    async def run(self, game):
+        self.sessions += 1
+        try:
+            await game.play()
+        except ClientGone as gone:
+            # Соперник, который остался, побеждает
+            for player in game.players:
+                if getattr(player, "conn", None) is not gone.conn:
+                    try:
+                        await player.notify("WIN LEFT")
+                    except ClientGone:
+                        pass
+            raise
+        finally:
+            self.sessions -= 1
+
+
+#  Запись метрик в файл каждые interval секунд
+async def dump_metrics(path, interval):
+    while True:
+        await asyncio.sleep(interval)
+        instrumentation.dump(path)
+
+
+#  Удаление устаревших сохранений игр каждые interval секунд
+async def sweep_checkpoints(server, interval):
+    while True:
+        await asyncio.sleep(interval)
+        server.expire_checkpoints()
+
+
+async def serve(host, port, ai=ServerAI, timeout=None, recorder=None, metrics=None, interval=10.0, pool=None,
+                checkpoints=None, checkpoint_ttl=CHECKPOINT_TTL):
+    server = Server(ai, timeout, recorder, pool, checkpoints, checkpoint_ttl)
+    listener = await asyncio.start_server(server.handle, host, port)
+    if checkpoints:
+        asyncio.create_task(sweep_checkpoints(server, min(CHECKPOINT_SWEEP, checkpoint_ttl)))
+    if metrics:
+        instrumentation.enable()
+        asyncio.create_task(dump_metrics(metrics, interval))
+    async with listener:
+        await listener.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Сервер морского боя")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7777)
+    parser.add_argument("--ai", choices=("density", "hunt", "random"), default="density", help="стратегия компьютера")
+    parser.add_argument("--timeout", type=float, default=None, help="сколько секунд ждать команду клиента")
+    parser.add_argument("--record", help="файл, в конец которого записываются партии, в том числе прерванные")
+    parser.add_argument("--metrics", help="файл для замеров движка в формате Prometheus")
+    parser.add_argument("--metrics-interval", type=float, default=10.0,
+                        help="как часто обновлять файл замеров, секунды")
+    parser.add_argument("--pool-size", type=int, default=256,
+                        help="сколько готовых расстановок держать для каждого размера доски (0 - без запаса)")
+    parser.add_argument("--pool-file", help="файл, в котором запас расстановок хранится между запусками")
+    parser.add_argument("--checkpoints", help="каталог, в котором сохраняются идущие игры с компьютером; "
+                                              "прерванную игру можно продолжить командой RESUME")
+    parser.add_argument("--checkpoint-hours", type=float, default=CHECKPOINT_TTL / 3600,
+                        help="сколько часов хранится сохранение брошенной игры")
+    args = parser.parse_args(argv)
+    if args.checkpoints:
+        os.makedirs(args.checkpoints, exist_ok=True)
+    ai = {"density": ServerAI, "hunt": ServerHuntAI, "random": ServerRandomAI}[args.ai]
+    recorder = RecordWriter(args.record) if args.record else None
+    pool = None
+    if args.pool_size > 0:
+        pool = BoardPool(args.pool_size, max(args.pool_size // 4, 1), args.pool_file)
+    try:
+        asyncio.run(serve(args.host, args.port, ai, args.timeout, recorder, args.metrics, args.metrics_interval,
+                          pool, args.checkpoints, args.checkpoint_hours * 3600))
+    finally:
+        if recorder is not None:
+            recorder.close()
+        if pool is not None:
+            pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+import argparse
+import json
+import random
+import time
+from multiprocessing import Pool
+
+from engine import AI, BaseGame, FleetGenerator, check_board, load_variants, variant_size
+from strategies import DensityAI, HuntTargetAI, MonteCarloAI
+
+# Стратегии, доступные для игр без интерфейса
+STRATEGIES = {
+    "random": AI,
+    "density": DensityAI,
+    "hunt": HuntTargetAI,
+    "montecarlo": MonteCarloAI,
+}
+
+
+class HeadlessGame(BaseGame):
+    # Игра компьютер против компьютера без вывода в терминал и без input().
+    # Доски и правила ходов те же, что и в terminal.Game.
+    # fleets - заранее выбранные расстановки флотов первого и второго игрока, иначе случайные
+    def __init__(self, size=6, first=AI, second=AI, ships=None, fleets=None):
+        super().__init__(size, ships)
+        # Создаем доски обоих игроков
+        if fleets is None:
+            first_board = self.random_board()
+            second_board = self.random_board()
+        else:
+            generator = FleetGenerator.get(self.size, self.ships)
+            first_board, second_board = (generator.board(fleet, self.board_cls) for fleet in fleets)
+        first_board.quiet = second_board.quiet = True
+        # Первый игрок ходит первым
+        self.players = (
+            first(first_board, second_board, quiet=True),
+            second(second_board, first_board, quiet=True),
+        )
+
+    # Цикл ходов, возвращает номер победителя (0 или 1) и кол-во его выстрелов
+    def loop(self):
+        # номер хода
+        num = 0
+        shots = [0, 0]
+        while True:
+            turn = num % 2
+            player = self.players[turn]
+            repeat = player.move()
+            shots[turn] += 1
+            # Проверяется все ли корабли уничтожены у противника
+            if player.enemy_board.defeat():
+                return turn, shots[turn]
+            # Если при текущем ходе поврежден корабль, то ходит еще раз этот же игрок.
+            if not repeat:
+                num += 1
+
+
+class SimulationStats:
+    # Итоговая статистика серии игр
+    def __init__(self):
+        self.games = 0  # Кол-во сыгранных игр
+        self.wins = [0, 0]  # Победы первого и второго игрока
+        self.shots = {}  # Распределение кол-ва выстрелов до победы: выстрелы -> кол-во игр
+        self.seconds = 0.0  # Время моделирования
+
+    # Добавление результатов части игр
+    def merge(self, wins, shots):
+        self.wins[0] += wins[0]
+        self.wins[1] += wins[1]
+        self.games += wins[0] + wins[1]
+        for count, games in shots.items():
+            self.shots[count] = self.shots.get(count, 0) + games
+
+    @property
+    def win_rate(self):
+        return self.wins[0] / self.games if self.games else 0.0
+
+    @property
+    def games_per_second(self):
+        return self.games / self.seconds if self.seconds else 0.0
+
+    @property
+    def mean_shots(self):
+        if not self.games:
+            return 0.0
+        return sum(count * games for count, games in self.shots.items()) / self.games
+
+    # Кол-во выстрелов, которого хватило для победы в доле q игр
+    def percentile(self, q):
+        need = q * self.games
+        total = 0
+        for count in sorted(self.shots):
+            total += self.shots[count]
+            if total >= need:
+                return count
+        return 0
+
+    def as_dict(self):
+        return {
+            "games": self.games,
+            "wins": list(self.wins),
+            "win_rate": self.win_rate,
+            "mean_shots": self.mean_shots,
+            "median_shots": self.percentile(0.5),
+            "p90_shots": self.percentile(0.9),
+            "shots": {str(count): self.shots[count] for count in sorted(self.shots)},
+            "seconds": self.seconds,
+            "games_per_second": self.games_per_second,
+        }
+
+    def __str__(self):
+        return (f"Игр: {self.games}, побед первого игрока: {self.wins[0]} ({self.win_rate:.1%}), "
+                f"второго: {self.wins[1]}\n"
+                f"Выстрелов до победы: в среднем {self.mean_shots:.1f}, медиана {self.percentile(0.5)}, "
+                f"90% игр - не более {self.percentile(0.9)}\n"
+                f"Скорость: {self.games_per_second:.0f} игр/с")
+
+
+# Серия игр в одном процессе. Генератор случайных чисел инициализируется номером части,
+# поэтому результат не зависит от того, какой процесс взял эту часть.
+def play_chunk(task):
+    seed, chunk, games, size, ships, first, second = task
+    random.seed(f"{seed}:{chunk}")
+    wins = [0, 0]
+    shots = {}
+    for _ in range(games):
+        winner, count = HeadlessGame(size, first, second, ships).loop()
+        wins[winner] += 1
+        shots[count] = shots.get(count, 0) + 1
+    return wins, shots
+
+
+# Моделирование games игр на пуле процессов
+def simulate(games, size=6, first=AI, second=AI, workers=None, seed=0, chunk_size=200, ships=None):
+    # Ошибка размера доски выдается сразу, а не в каждом процессе пула
+    check_board(first, size)
+    check_board(second, size)
+    tasks = []
+    for chunk, start in enumerate(range(0, games, chunk_size)):
+        tasks.append((seed, chunk, min(chunk_size, games - start), size, ships, first, second))
+
+    stats = SimulationStats()
+    started = time.perf_counter()
+    if workers == 1:
+        for wins, shots in map(play_chunk, tasks):
+            stats.merge(wins, shots)
+    else:
+        with Pool(workers) as pool:
+            for wins, shots in pool.imap_unordered(play_chunk, tasks):
+                stats.merge(wins, shots)
+    stats.seconds = time.perf_counter() - started
+    return stats
+
+
+#  Размер доски из командной строки: "10" или "12x16"
+def parse_size(text):
+    rows, _, cols = text.lower().partition("x")
+    if not cols:
+        return int(rows)
+    return int(rows), int(cols)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Моделирование игр компьютер против компьютера")
+    parser.add_argument("-n", "--games", type=int, default=1000, help="кол-во игр")
+    parser.add_argument("-s", "--size", type=parse_size, default=6, help="размер доски: 10 или 12x16")
+    parser.add_argument("--variant", help="вариант игры из файла настроек (размер доски и корабли)")
+    parser.add_argument("--config", help="файл настроек с вариантами игры")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="кол-во процессов (по умолчанию все ядра)")
+    parser.add_argument("--seed", type=int, default=0, help="начальное значение генератора случайных чисел")
+    parser.add_argument("--chunk", type=int, default=200, help="кол-во игр в одной задаче процесса")
+    parser.add_argument("--first", choices=sorted(STRATEGIES), default="random", help="стратегия первого игрока")
+    parser.add_argument("--second", choices=sorted(STRATEGIES), default="random", help="стратегия второго игрока")
+    parser.add_argument("--json", action="store_true", help="вывести статистику в формате JSON")
+    args = parser.parse_args(argv)
+
+    size, ships = args.size, None
+    if args.variant:
+        variants = {variant["name"]: variant for variant in load_variants(args.config)}
+        if args.variant not in variants:
+            parser.error(f"нет варианта {args.variant}, есть: {', '.join(variants)}")
+        size, ships = variant_size(variants[args.variant]), variants[args.variant]["ships"]
+
+    try:
+        stats = simulate(args.games, size, STRATEGIES[args.first], STRATEGIES[args.second],
+                         workers=args.workers, seed=args.seed, chunk_size=args.chunk, ships=ships)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.json:
+        print(json.dumps(stats.as_dict(), ensure_ascii=False, indent=2))
+    else:
+        print(stats)
+
+
+if __name__ == "__main__":
+    main()
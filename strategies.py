@@ -0,0 +1,413 @@
+import atexit
+import os
+import random
+import time
+from multiprocessing import Pool, TimeoutError, current_process
+from random import randint
+
+import opening_book
+from engine import AI, Dot, FleetGenerator, check_board
+
+
+class TrackingAI(AI):
+    # Компьютерный игрок, который запоминает результаты своих выстрелов:
+    # куда уже стреляли, где ранены корабли и какие клетки заведомо пусты.
+    # Наследники выбирают номер клетки в методе choose и никогда не стреляют повторно.
+    def __init__(self, my_board, enemy_board, quiet=False):
+        super().__init__(my_board, enemy_board, quiet)
+        self.rows, self.cols = enemy_board.rows, enemy_board.cols
+        self.tried = bytearray(self.rows * self.cols)  # 1 - в клетку стреляли или она заведомо пуста
+        self.wounded = []  # Клетки раненых, но еще не уничтоженных кораблей
+        # Кол-во еще не уничтоженных кораблей каждой длины (состав флота известен по правилам игры)
+        self.remaining = {}
+        for ship in enemy_board.ships:
+            self.remaining[ship.length] = self.remaining.get(ship.length, 0) + 1
+
+    def ask(self):
+        i = self.choose()
+        # Клетка отмечается сразу, поэтому при исключении в Player.move будет выбрана другая
+        self.tried[i] = 1
+        return Dot(i // self.cols, i % self.cols)
+
+    # Номер клетки для следующего выстрела
+    def choose(self):
+        raise NotImplementedError()
+
+    # Соседние клетки: по сторонам (diagonal=False) или по диагоналям (diagonal=True)
+    def neighbours(self, i, diagonal=False):
+        cols = self.cols
+        x, y = divmod(i, cols)
+        steps = ((-1, -1), (-1, 1), (1, -1), (1, 1)) if diagonal else ((-1, 0), (1, 0), (0, -1), (0, 1))
+        return [(x + dx) * cols + y + dy for dx, dy in steps
+                if 0 <= x + dx < self.rows and 0 <= y + dy < cols]
+
+    def observe(self, d, hit, sunk):
+        i = d.x * self.cols + d.y
+        # Обычно клетка уже отмечена в ask, но при Player.replay выстрелы сообщаются без ask
+        self.tried[i] = 1
+        if not hit:
+            self.on_empty(i)
+            return
+        self.wounded.append(i)
+        self.on_hit(i)
+        # Корабли прямые, поэтому по диагонали от раненой клетки корабля быть не может
+        for j in self.neighbours(i, diagonal=True):
+            if not self.tried[j]:
+                self.tried[j] = 1
+                self.on_empty(j)
+        if sunk:
+            # Корабли не касаются друг друга, поэтому уничтоженный корабль - это все раненые клетки,
+            # связанные с последним попаданием
+            ship = [i]
+            for j in ship:
+                for k in self.neighbours(j):
+                    if k in self.wounded and k not in ship:
+                        ship.append(k)
+            self.wounded = [j for j in self.wounded if j not in ship]
+            # Ареал уничтоженного корабля пуст
+            contour = []
+            for j in ship:
+                for k in self.neighbours(j):
+                    if not self.tried[k]:
+                        self.tried[k] = 1
+                        contour.append(k)
+            for k in contour:
+                self.on_empty(k)
+            self.on_sunk(ship)
+            self.remaining[len(ship)] -= 1
+
+    # Клетка i оказалась пустой (промах или ареал)
+    def on_empty(self, i):
+        pass
+
+    # Попадание в клетку i
+    def on_hit(self, i):
+        pass
+
+    # Уничтожен корабль из клеток ship (до уменьшения self.remaining)
+    def on_sunk(self, ship):
+        pass
+
+    # Случайная клетка, в которую еще не стреляли
+    def any_untried(self):
+        free = [i for i, tried in enumerate(self.tried) if not tried]
+        return free[randint(0, len(free) - 1)]
+
+
+class DensityAI(TrackingAI):
+    # Компьютерный игрок, стреляющий в клетку с наибольшей плотностью возможных положений
+    # оставшихся кораблей. Плотность не пересчитывается заново, а уменьшается после каждого
+    # выстрела на вклад положений, которые стали невозможны.
+    # Пока нет попаданий, первые выстрелы берутся из книги дебютов, если она построена для этой доски.
+    book_file = None  # Файл книги дебютов (None - файл по умолчанию)
+    # Положения всех кораблей хранятся списками: на доске 100x100 это около 100 тысяч положений и 50 МБ,
+    # а на доске 1000x1000 - десятки миллионов, которые не помещаются в память
+    max_cells = 10000
+
+    def __init__(self, my_board, enemy_board, quiet=False):
+        check_board(type(self), (enemy_board.rows, enemy_board.cols))
+        super().__init__(my_board, enemy_board, quiet)
+        rows, cols = self.rows, self.cols
+        lens = [ship.length for ship in enemy_board.ships]
+        self.opening = opening_book.opening((rows, cols), lens, self.book_file)  # Оставшиеся ходы дебюта
+        self.opening_step = 0
+        self.slot_cells = []  # Клетки каждого положения корабля
+        self.slot_length = []  # Длина корабля в положении
+        self.length_slots = {length: [] for length in self.remaining}  # Положения кораблей каждой длины
+        self.cell_slots = [[] for _ in range(rows * cols)]  # Положения, проходящие через клетку
+        for length in self.remaining:
+            for orientation in FleetGenerator.orientations(length):
+                for x in range(rows - (length - 1) * orientation):
+                    for y in range(cols - (length - 1) * (1 - orientation)):
+                        cells = tuple((x + k * orientation) * cols + y + k * (1 - orientation)
+                                      for k in range(length))
+                        for c in cells:
+                            self.cell_slots[c].append(len(self.slot_cells))
+                        self.length_slots[length].append(len(self.slot_cells))
+                        self.slot_cells.append(cells)
+                        self.slot_length.append(length)
+        self.alive = bytearray([1]) * len(self.slot_cells)  # Положение еще возможно
+        # Плотность: сумма по возможным положениям, покрывающим клетку, кол-ва кораблей этой длины
+        self.density = [0] * (rows * cols)
+        for s, cells in enumerate(self.slot_cells):
+            for c in cells:
+                self.density[c] += self.remaining[self.slot_length[s]]
+
+    def on_hit(self, i):
+        # Дебют рассчитан только на промахи
+        self.opening = ()
+
+    def on_empty(self, i):
+        # Все положения через пустую клетку невозможны
+        for s in self.cell_slots[i]:
+            if self.alive[s]:
+                self._kill(s)
+
+    def _kill(self, s):
+        self.alive[s] = 0
+        weight = self.remaining[self.slot_length[s]]
+        for c in self.slot_cells[s]:
+            self.density[c] -= weight
+
+    def on_sunk(self, ship):
+        # Клетки уничтоженного корабля больше не могут быть заняты другими кораблями
+        for i in ship:
+            for s in self.cell_slots[i]:
+                if self.alive[s]:
+                    self._kill(s)
+        # Кораблей этой длины стало на один меньше. Невозможные положения убираются из списка,
+        # чтобы следующие уничтоженные корабли этой длины перебирали только возможные
+        length = len(ship)
+        slots = self.length_slots[length] = [s for s in self.length_slots[length] if self.alive[s]]
+        for s in slots:
+            for c in self.slot_cells[s]:
+                self.density[c] -= 1
+
+    def choose(self):
+        tried = self.tried
+        if self.opening_step < len(self.opening):
+            i = self.opening[self.opening_step]
+            self.opening_step += 1
+            if not tried[i]:
+                return i
+            self.opening = ()
+        if self.wounded:
+            # Добивание: оцениваем только положения, проходящие через раненые клетки
+            score = {}
+            wounded = set(self.wounded)
+            for w in self.wounded:
+                for s in self.cell_slots[w]:
+                    if not self.alive[s]:
+                        continue
+                    cells = self.slot_cells[s]
+                    weight = self.remaining[self.slot_length[s]] * len(wounded.intersection(cells))
+                    for c in cells:
+                        if not tried[c]:
+                            score[c] = score.get(c, 0) + weight
+        else:
+            score = {c: p for c, p in enumerate(self.density) if p > 0 and not tried[c]}
+        if not score:
+            return self.any_untried()
+        best = max(score.values())
+        cells = [c for c, p in score.items() if p == best]
+        return cells[randint(0, len(cells) - 1)]
+
+
+class HuntTargetAI(TrackingAI):
+    # Быстрый компьютерный игрок: стреляет наугад, пока не попадет, затем добивает корабль,
+    # стреляя рядом с попаданиями вдоль оси корабля. Непроверенные клетки хранятся в перемешанном
+    # массиве: выстрел наугад - последний элемент, а клетка, ставшая известной, удаляется заменой
+    # на последний элемент. Поэтому выбор клетки не зависит от размера доски и никогда не
+    # приводит к повторному выстрелу.
+    def __init__(self, my_board, enemy_board, quiet=False):
+        super().__init__(my_board, enemy_board, quiet)
+        self.order = list(range(self.rows * self.cols))  # Непроверенные клетки в случайном порядке
+        random.shuffle(self.order)
+        self.position = [0] * len(self.order)  # Место клетки в self.order (-1 - клетка удалена)
+        for k, i in enumerate(self.order):
+            self.position[i] = k
+        self.frontier = []  # Клетки рядом с раненым кораблем, куда стоит стрелять
+
+    #  Удаление клетки из непроверенных
+    def _remove(self, i):
+        k = self.position[i]
+        if k < 0:
+            return
+        last = self.order.pop()
+        if last != i:
+            self.order[k] = last
+            self.position[last] = k
+        self.position[i] = -1
+
+    def on_empty(self, i):
+        self._remove(i)
+
+    def on_hit(self, i):
+        self._remove(i)
+        # Клетки раненого корабля: попадания рядом с этой клеткой (корабли не касаются друг друга)
+        ship = [i]
+        for j in ship:
+            for k in self.neighbours(j):
+                if k in self.wounded and k not in ship:
+                    ship.append(k)
+        if len(ship) == 1:
+            self.frontier = self.neighbours(i)
+            return
+        # Ось корабля известна: стреляем только за его концы
+        cols = self.cols
+        first, last = min(ship), max(ship)
+        self.frontier = []
+        if last - first < cols:
+            # Горизонтальный корабль
+            if first % cols:
+                self.frontier.append(first - 1)
+            if (last + 1) % cols:
+                self.frontier.append(last + 1)
+        else:
+            if first >= cols:
+                self.frontier.append(first - cols)
+            if last + cols < len(self.tried):
+                self.frontier.append(last + cols)
+
+    def on_sunk(self, ship):
+        self.frontier = []
+
+    def choose(self):
+        while self.frontier:
+            i = self.frontier.pop()
+            if not self.tried[i]:
+                return i
+        i = self.order[-1]
+        self._remove(i)
+        return i
+
+
+_pool = None  # Общий пул процессов для выборки расстановок
+
+
+#  Пул процессов создается при первом ходе игрока MonteCarloAI и закрывается при выходе
+def sampling_pool(workers):
+    global _pool
+    if _pool is None:
+        _pool = Pool(workers)
+        atexit.register(_pool.terminate)
+    return _pool
+
+
+#  Случайные расстановки оставшихся кораблей, согласованные с тем, что известно о доске:
+#  корабли не занимают клетки маски forbidden и покрывают все клетки маски wounded.
+#  Положения кораблей берутся из FleetGenerator для полного флота lens, ставятся корабли remaining.
+#  Выборка идет до момента deadline (по time.time, общему для всех процессов) или пока не наберется
+#  limit расстановок. Задача, взятая процессом пула после deadline, сразу возвращает пустой список.
+#  Каждая расстановка - (маска всех клеток, кортеж (маска клеток корабля, длина)).
+def sample_fleets(size, lens, remaining, forbidden, wounded, deadline, limit, seed):
+    rng = random.Random(seed)
+    slots = FleetGenerator.get(size, lens).slots
+    legal = {length: [(s[3], s[4]) for s in slots[length] if not s[3] & forbidden] for length in set(remaining)}
+    samples = []
+    while len(samples) < limit and time.time() < deadline:
+        fleet = _sample_fleet(rng, legal, sorted(remaining, reverse=True), wounded)
+        if fleet is not None:
+            samples.append(fleet)
+    return samples
+
+
+#  Одна расстановка или None, если попытка зашла в тупик
+def _sample_fleet(rng, legal, ships, wounded):
+    blocked = 0  # Клетки, занятые кораблями и их ареалом
+    cells = 0
+    fleet = []
+    # Сначала корабли через раненые клетки: положение, покрывающее первую непокрытую раненую клетку
+    uncovered = wounded
+    while uncovered:
+        cell = uncovered & -uncovered
+        choices = [(length, slot) for length in set(ships) for slot in legal[length]
+                   if slot[0] & cell and not slot[0] & blocked]
+        if not choices:
+            return None
+        length, (ship, area) = choices[rng.randrange(len(choices))]
+        ships.remove(length)
+        blocked |= area
+        cells |= ship
+        fleet.append((ship, length))
+        uncovered &= ~ship
+    # Остальные корабли - в любые свободные положения, не задевающие раненые клетки
+    for length in ships:
+        choices = [slot for slot in legal[length] if not slot[0] & blocked and not slot[1] & wounded]
+        if not choices:
+            return None
+        ship, area = choices[rng.randrange(len(choices))]
+        blocked |= area
+        cells |= ship
+        fleet.append((ship, length))
+    return cells, tuple(fleet)
+
+
+class MonteCarloAI(DensityAI):
+    # Компьютерный игрок для сильной игры: перед каждым ходом набирает случайные расстановки
+    # оставшихся кораблей, согласованные с промахами, ранеными клетками и ареалами уничтоженных
+    # кораблей, и стреляет в клетку, занятую в наибольшем числе расстановок. Расстановки
+    # набираются на пуле процессов с ограничением времени на ход. После выстрела отбрасываются
+    # только расстановки, противоречащие его результату, остальные используются на следующем ходу.
+    # Если доска слишком велика для масок или расстановки набрать не удалось, ход делает DensityAI,
+    # поэтому и ограничение на размер доски max_cells то же, что у DensityAI.
+    budget = 0.05  # Время на выборку расстановок за один ход, секунды
+    limit = 2000  # Сколько расстановок хранить
+    workers = os.cpu_count() or 1  # Кол-во процессов выборки (1 - выборка в своем процессе)
+
+    def __init__(self, my_board, enemy_board, quiet=False):
+        super().__init__(my_board, enemy_board, quiet)
+        self.lens = [ship.length for ship in enemy_board.ships]
+        self.slots = FleetGenerator.get((self.rows, self.cols), self.lens).slots is not None
+        self.samples = []  # Расстановки, согласованные со всеми выстрелами
+
+    def on_empty(self, i):
+        super().on_empty(i)
+        bit = 1 << i
+        self.samples = [s for s in self.samples if not s[0] & bit]
+
+    def on_hit(self, i):
+        super().on_hit(i)
+        bit = 1 << i
+        self.samples = [s for s in self.samples if s[0] & bit]
+
+    def on_sunk(self, ship):
+        super().on_sunk(ship)
+        # Остаются расстановки, где ровно на этом месте стоит корабль; сам корабль из них убирается
+        mask = 0
+        for i in ship:
+            mask |= 1 << i
+        samples = []
+        for cells, fleet in self.samples:
+            for k, (ship_cells, _) in enumerate(fleet):
+                if ship_cells == mask:
+                    samples.append((cells ^ mask, fleet[:k] + fleet[k + 1:]))
+                    break
+        self.samples = samples
+
+    def choose(self):
+        if not self.slots or self.opening_step < len(self.opening):
+            return super().choose()
+        if len(self.samples) < self.limit:
+            self.sample(self.limit - len(self.samples))
+        tried = self.tried
+        score = [0] * len(tried)
+        for cells, _ in self.samples:
+            while cells:
+                bit = cells & -cells
+                score[bit.bit_length() - 1] += 1
+                cells ^= bit
+        best = max((i for i in range(len(tried)) if not tried[i]), key=score.__getitem__, default=None)
+        if best is None or not score[best]:
+            return super().choose()
+        cells = [i for i in range(len(tried)) if not tried[i] and score[i] == score[best]]
+        return cells[randint(0, len(cells) - 1)]
+
+    #  Добор count расстановок на пуле процессов или в своем процессе
+    def sample(self, count):
+        forbidden = 0
+        wounded = 0
+        for i in self.wounded:
+            wounded |= 1 << i
+        for i, tried in enumerate(self.tried):
+            if tried:
+                forbidden |= 1 << i
+        forbidden &= ~wounded
+        remaining = [length for length, number in self.remaining.items() for _ in range(number)]
+        deadline = time.time() + self.budget
+        args = ((self.rows, self.cols), self.lens, remaining, forbidden, wounded, deadline)
+        # В процессах пула (например, в simulator.py) свой пул создать нельзя
+        if self.workers <= 1 or current_process().daemon:
+            self.samples.extend(sample_fleets(*args, count, random.getrandbits(32)))
+            return
+        pool = sampling_pool(self.workers)
+        share = -(-count // self.workers)
+        results = [pool.apply_async(sample_fleets, args + (share, random.getrandbits(32)))
+                   for _ in range(self.workers)]
+        # Результаты ждем не дольше второго budget после окончания выборки - на весь ход, а не на каждую задачу
+        wait = deadline + self.budget
+        for result in results:
+            try:
+                self.samples.extend(result.get(timeout=max(0, wait - time.time())))
+            except TimeoutError:
+                pass
@@ -0,0 +1,410 @@
+import shutil
+import sys
+
+from colorama import Back, Fore, Style
+
+from engine import (AI, HIT, MISS, SUNK, BaseGame, BitBoard, Dot, FleetValidator, Player, Ship,
+                    ShipOutBoardException, load_variants, variant_size)
+from records import GameRecord
+
+# Вывод игры в терминал: цветные доски, сообщения и ввод пользователя. Состояние игры - в engine.py.
+
+# Сообщения о результате выстрела
+RESULT_MESSAGES = {
+    MISS: Fore.BLUE + Style.BRIGHT + "Промах!" + Style.RESET_ALL,
+    HIT: Fore.GREEN + Style.BRIGHT + "⚔ Корабль повреждён!" + Style.RESET_ALL,
+    SUNK: Fore.MAGENTA + Style.BRIGHT + "⚔ Корабль уничтожен!" + Style.RESET_ALL,
+}
+
+
+class ConsoleBoard(BitBoard):
+    # Доска с цветной отрисовкой в терминале и сообщениями о выстрелах.
+    # Отрисовка кэшируется: после выстрела перерисовываются только изменившиеся клетки и строки.
+
+    # Обозначения клеток
+    HIT_CELL = Fore.RED + Style.BRIGHT + "☠" + Style.RESET_ALL
+    MISS_CELL = Fore.LIGHTBLACK_EX + Style.BRIGHT + "⛯" + Style.RESET_ALL
+    MARK_CELL = Fore.LIGHTBLACK_EX + Style.BRIGHT + "⛭" + Style.RESET_ALL
+    SHIP_CELL = Fore.LIGHTYELLOW_EX + Style.BRIGHT + "⛴" + Style.RESET_ALL
+
+    def __init__(self, hid=False, size=6, quiet=False):
+        super().__init__(hid, size, quiet)
+        self.empty_cell = Fore.LIGHTBLUE_EX + Style.BRIGHT + "⛆" + Style.RESET_ALL  # Обозначение пустой ячейки
+        self.columns = [["   |"] + [str(j + 1) + " " + "| " for j in range(self.cols)]]  # Обозначение столбцов
+
+        # Кэш отрисовки: клетки, изменившиеся после прошлой отрисовки, обозначения клеток и строки поля
+        self.header = " ".join((' '.join(map(str, col)) for col in self.columns))
+        self.dirty = set()
+        self.view = None
+        self.lines = [""] * self.rows
+        self.view_hid = hid
+
+    def __str__(self):
+        # Создаем игровое поле, перерисовываются только изменившиеся строки
+        self.refresh()
+        return self.header + "\n" + "\n".join(self.lines)
+
+    #  Обозначение клетки по ее флагам
+    def render_cell(self, flags):
+        if flags & self.SHOT:
+            return self.HIT_CELL if flags & self.SHIP else self.MISS_CELL
+        if flags & self.MARK:
+            return self.MARK_CELL
+        if flags & self.SHIP and not self.hid:
+            return self.SHIP_CELL
+        return self.empty_cell
+
+    #  Обновление кэша отрисовки. Возвращает номера строк поля, изменившихся с прошлой отрисовки.
+    def refresh(self):
+        cols = self.cols
+        if self.view is None or self.view_hid != self.hid:
+            # Первая отрисовка или доску скрыли: рисуем все клетки
+            self.view_hid = self.hid
+            self.view = [self.render_cell(flags) for flags in self.cells]
+            changed = range(self.rows)
+        else:
+            changed = set()
+            for i in self.dirty:
+                self.view[i] = self.render_cell(self.cells[i])
+                changed.add(i // cols)
+            changed = sorted(changed)
+        self.dirty.clear()
+        for x in changed:
+            self.lines[x] = f"{x + 1}  | " + " | ".join(self.view[x * cols:(x + 1) * cols]) + " |"
+        return changed
+
+    def _occupy(self, i, flag):
+        super()._occupy(i, flag)
+        if flag == self.MARK:
+            self.dirty.add(i)
+
+    def add_ship(self, ship):
+        super().add_ship(ship)
+        self.dirty.update(self.index(d) for d in ship.dots)
+
+    def shot(self, d):
+        repeat = super().shot(d)
+        self.dirty.add(self.history[-1])
+        return repeat
+
+    def report(self, result):
+        if not self.quiet:
+            print(RESULT_MESSAGES[result])
+
+    def restore(self, snapshot):
+        super().restore(snapshot)
+        # Изменившиеся клетки неизвестны, поэтому доска перерисовывается целиком.
+        # После trial кэш остается верным: все клетки, измененные выстрелами, уже отмечены.
+        self.view = None
+        self.dirty.clear()
+
+
+class TerminalRenderer:
+    # Вывод досок в терминал. Кадр собирается целиком и выводится одной записью.
+    # В режиме cursor=True доски остаются вверху экрана, при следующих кадрах перерисовываются
+    # только изменившиеся строки досок, а сообщения игры прокручиваются в области под досками.
+    def __init__(self, stream=None, cursor=False):
+        self.stream = stream or sys.stdout
+        self.cursor = cursor
+        self.positions = None  # Строка экрана, на которой начинается поле каждой доски
+
+    #  Вывод кадра, sections - список пар (заголовок, доска)
+    def draw(self, sections):
+        if self.cursor and self.positions is not None:
+            frame = self._changes(sections)
+        else:
+            frame = self._frame(sections)
+        self.stream.write(frame)
+        self.stream.flush()
+
+    #  Полный кадр
+    def _frame(self, sections):
+        lines = []
+        positions = []
+        for title, board in sections:
+            lines.append(Style.BRIGHT + "-" * 20)
+            lines.append(Fore.MAGENTA + title + Style.RESET_ALL)
+            # Первая строка поля идет после строки с номерами столбцов
+            positions.append(len(lines) + 2)
+            lines.extend(str(board).split("\n"))
+            lines.append("")
+        lines.append(Style.BRIGHT + "-" * 20 + Style.RESET_ALL)
+        frame = "\n".join(lines) + "\n"
+        if not self.cursor:
+            return frame
+        # Доски вверху экрана, ниже область прокрутки для сообщений
+        self.positions = positions
+        height = len(lines)
+        bottom = shutil.get_terminal_size().lines
+        return f"\x1b[2J\x1b[H{frame}\x1b[{height + 1};{bottom}r\x1b[{height + 1};1H"
+
+    #  Только изменившиеся строки досок, положение курсора сохраняется
+    def _changes(self, sections):
+        parts = ["\x1b7"]
+        for (title, board), position in zip(sections, self.positions):
+            for x in board.refresh():
+                parts.append(f"\x1b[{position + x};1H{board.lines[x]}\x1b[K")
+        parts.append("\x1b8")
+        return "".join(parts)
+
+    #  Возврат терминала в обычный режим
+    def close(self):
+        if self.cursor and self.positions is not None:
+            self.stream.write("\x1b[r")
+            self.stream.flush()
+
+
+class ConsolePlayer:
+    # Сообщения игрока в терминале: отклоненный выстрел
+    def report_error(self, error):
+        if not self.quiet:
+            print(Fore.RED + Style.BRIGHT + str(error) + Style.RESET_ALL)
+
+
+class ConsoleAI(ConsolePlayer, AI):
+    # Компьютерный игрок, ходы которого выводятся в терминал
+    def announce(self, d):
+        if not self.quiet:
+            print(Style.BRIGHT + f"Ход компьютера: {d.x + 1} {d.y + 1}" + Style.RESET_ALL)
+
+
+class User(ConsolePlayer, Player):
+    # Ходы реального игрока
+    def ask(self):
+        while True:
+            # Ввод координат пользователя
+            coordinates_shot = input(Fore.MAGENTA + Style.BRIGHT + "Ваш выстрел ⛶ : " + Style.RESET_ALL).split()
+            # Проверка, что пользователем введены 2 координаты
+            if len(coordinates_shot) != 2:
+                print(Fore.RED + Style.BRIGHT + "⚡ Введите 2 координаты! " + Style.RESET_ALL)
+                continue
+
+            x, y = coordinates_shot
+            # Проверка, что эти 2 числа, а не буквы или символы
+            if not (x.isdigit()) or not (y.isdigit()):
+                print(Fore.RED + Style.BRIGHT + "⚡ Введите числа! " + Style.RESET_ALL)
+                continue
+
+            x, y = int(x), int(y)
+            # Возвращаем координаты выстрела с корректировкой (игровое поле начинается с 1, а индексы с 0)
+            return Dot(x - 1, y - 1)
+
+
+class SetupShips:
+    def __init__(self, line_ship):
+        self.line_ship = line_ship
+
+    @property
+    def setup_ship(self):
+        while True:
+            parameter_ship = input(
+                Fore.MAGENTA + Style.BRIGHT + f'Введите координаты для {self.line_ship}'
+                                              f'-палубного корабля: \nКоординаты носа - X Y '
+                                              f'и расположение корабля: '
+                                              f'0 - горизонтальное, 1 - вертикальное: ' + Style.RESET_ALL).split()
+
+            if len(parameter_ship) != 3:
+                print(Fore.RED + Style.BRIGHT + "⚡ Введите 3 цифры из которых 2 координаты носа корабля (X Y) "
+                                                "и одна расположение корабля (0 или 1)! " + Style.RESET_ALL)
+                continue
+
+            x, y, r = parameter_ship
+            # Проверка, что эти 3 числа, а не буквы или символы
+            if not (x.isdigit() and y.isdigit() and r.isdigit()):
+                print(Fore.RED + Style.BRIGHT + "⚡ Введите 3 числа! " + Style.RESET_ALL)
+                continue
+
+            if not (int(r) == 0 or int(r) == 1):
+                print(Fore.RED + Style.BRIGHT + "⚡ Расположение корабля: "
+                                                "0 - горизонтальное или 1 - вертикальное!" + Style.RESET_ALL)
+                continue
+
+            # (игровое поле начинается с 1, а индексы с 0)
+            return Ship(Dot(int(x) - 1, int(y) - 1), length=self.line_ship, orientation=int(r))
+
+
+class Game(BaseGame):
+    # Партия пользователя с компьютером в терминале
+    board_cls = ConsoleBoard
+    max_cells = 400  # Варианты с досками больше этого кол-ва клеток не предлагаются: их не уместить в терминале
+
+    def __init__(self, cursor=False, variants=None, recorder=None):
+        super().__init__(recorder=recorder)
+        # Вывод досок в терминал
+        self.renderer = TerminalRenderer(cursor=cursor)
+        # Варианты игры: размеры доски и набор кораблей
+        self.variants = [variant for variant in variants or load_variants()
+                         if variant["rows"] * variant["cols"] <= self.max_cells]
+        # Приветствие
+        self.greet()
+        # Размер доски и набор кораблей
+        self.size = self.survey
+        # Создаем доску для пользователя
+        pl = self.restart_board()  # Сделал чтобы игрок сам выбирал размещение кораблей
+        # Создаем доску компьютерного игрока
+        co = self.random_board()
+        # Скрываем размещение кораблей на доске компьютера
+        co.hid = True
+        # Создаем компьютерного игрока
+        self.ai = ConsoleAI(co, pl)
+        # Создаем пользовательского игрока
+        self.us = User(pl, co)
+        self.players = (self.us, self.ai)
+        # Запись партии: пользователь - игрок 0, компьютер - игрок 1
+        if recorder is not None:
+            self.record = GameRecord.from_boards(pl, co)
+
+        # Расставляем рандомно корабли на доске
+
+    def user_board(self):
+        # размер доски
+        board = ConsoleBoard(size=self.size)
+        validator = FleetValidator.get(self.size, self.ships)
+        # Попытки размещения всех кораблей на одной доске
+        # attempts = 0
+        for sl in self.ships:
+            while True:
+                # Если некуда поставить корабль, то перезапускаем доску
+                fleet = [(s.bow.x, s.bow.y, s.orientation, s.length) for s in board.ships]
+                if not validator.has_slot(validator.blocked(fleet), sl):
+                    print(Fore.RED + Style.BRIGHT + '⚡ Некуда поставить корабль '
+                                                    'доска будет перезапущена! ' + Style.RESET_ALL)
+                    return None
+                print(board)
+                # Размещаем корабль
+                ship = SetupShips(sl).setup_ship
+                try:
+                    # Получилось добавить корабль
+                    board.add_ship(ship)
+                    break
+                # Не удалось добавить корабль
+                except ShipOutBoardException:
+                    print(Fore.RED + Style.BRIGHT + '⚡ Не удалось добавить корабль! '
+                                                    'Введите другие параметры' + Style.RESET_ALL)
+                    pass
+        # Очистка координат размещенных кораблей, для того чтобы записывать координаты выстрелов
+        board.pure_busy_dots()
+        # Если удалось разместить все корабли, то создаем доску для начала игры
+        return board
+
+    def restart_board(self):
+        board = None
+        while board is None:
+            board = self.user_add_ship
+        return board
+
+    # Приветствие пользователя
+    def greet(self):
+        print(Fore.CYAN + Style.BRIGHT + "------------------------")
+        print("    Приветствуем вас    ")
+        print("         в игре         ")
+        print("       морской бой!     ")
+        print("    ⛵      ☄     ⛵    ")
+        print("------------------------")
+        print(f"Предлагаем Вам {len(self.variants)} варианта игры:")
+        for number, variant in enumerate(self.variants, 1):
+            print(f"{number} - Доска {variant['rows']}Х{variant['cols']} и {len(variant['ships'])} кораблей 🔱")
+        print(Style.RESET_ALL, end="")
+        # print(Fore.MAGENTA + Style.BRIGHT + "    формат ввода: x y   ")
+        # print("    x - номер строки    ")
+        # print("    y - номер столбца   " + Style.RESET_ALL)
+
+    # Выводит на экран доски
+    def print_boards(self):
+        self.renderer.draw([("Доска пользователя:", self.us.my_board), ("Доска компьютера:", self.ai.my_board)])
+
+    # Цикл ходов
+    def loop(self):
+        # номер хода
+        num = 0
+        while True:
+            self.print_boards()
+            # По четным ходам ходит пользователь по нечетным компьютер
+            if num % 2 == 0:
+                print(Fore.MAGENTA + Style.BRIGHT + "♘ Ходит пользователь!" + Style.RESET_ALL)
+                print(Fore.MAGENTA + Style.BRIGHT + "Формат ввода: x y"
+                                                    ", где x - номер строки; y - номер столбца " + Style.RESET_ALL)
+                repeat = self.us.move()
+                self.remember(0, self.ai.my_board)
+            else:
+                print(Style.BRIGHT + "♞ Ходит компьютер!" + Style.RESET_ALL)
+                repeat = self.ai.move()
+                self.remember(1, self.us.my_board)
+                # Если при текущем ходе поврежден корабль, то ходит еще раз этот же игрок.
+            if repeat:
+                num -= 1
+            # Проверяется все ли корабли уничтожены у игрока
+            if self.ai.my_board.defeat():
+                self.finish(0)
+                self.print_boards()
+                print("-" * 20)
+                print("🏆" + Fore.GREEN + Style.BRIGHT + " Вы выиграли!" + Style.RESET_ALL)
+                break
+
+            if self.us.my_board.defeat():
+                self.finish(1)
+                self.print_boards()
+                print("-" * 20)
+                print("🏆" + Back.WHITE + Fore.BLACK + Style.BRIGHT + " Компьютер выиграл!" + Style.RESET_ALL)
+                break
+            num += 1
+
+    def start(self):
+        self.greet()
+        self.loop()
+        self.renderer.close()
+
+    @property
+    def survey(self):
+        while True:
+            count = len(self.variants)
+            # Ввод типа игры
+            type_game = input(Fore.MAGENTA + Style.BRIGHT + "Какой вариант игры "
+                                                            f"Вы выбираете (1 - {count}) ? " + Style.RESET_ALL).strip()
+            # Проверка, что это число
+            if not (type_game.isdigit()):
+                print(Fore.RED + Style.BRIGHT + "⚡ Введите число! " + Style.RESET_ALL)
+                continue
+
+            # Проверка, что есть такой вариант игры
+            if not (1 <= int(type_game) <= count):
+                print(Fore.RED + Style.BRIGHT + f"⚡ Введите число от 1 до {count} " + Style.RESET_ALL)
+                continue
+
+            # В зависимости от выбора типа игры выбираем размер игрового поля и набор кораблей
+            variant = self.variants[int(type_game) - 1]
+            self.size = variant_size(variant)
+            self.ships = list(variant["ships"])
+            return self.size
+
+    @property
+    def user_add_ship(self):
+        while True:
+
+            question_add_ship = input(
+                Fore.MAGENTA + Style.BRIGHT + "Вы хотите расставить корабли рандомно или самостоятельно?"
+                                              " (0 - рандомно, 1 - сами)? " + Style.RESET_ALL)
+            if len(question_add_ship) != 1:
+                print(Fore.RED + Style.BRIGHT + "⚡ Введите одно число! " + Style.RESET_ALL)
+                continue
+
+            # Проверка, что это число
+            if not (question_add_ship.isdigit()):
+                print(Fore.RED + Style.BRIGHT + "⚡ Введите число! " + Style.RESET_ALL)
+                continue
+
+            # Проверка, что это число 0 или 1
+            if not (int(question_add_ship) == 0 or 1):
+                print(Fore.RED + Style.BRIGHT + "⚡ Введите либо 0 или 1 " + Style.RESET_ALL)
+                continue
+
+            # В зависимости от выбора типа игры выбираем размер игрового поля
+            if int(question_add_ship) == 0:
+                user_field = self.random_board()
+            elif int(question_add_ship) == 1:
+                user_field = self.user_board()
+
+            else:
+                print(Fore.RED + Style.BRIGHT + "⚡ Введите цифру 0 или 1: " + Style.RESET_ALL)
+                continue
+            return user_field
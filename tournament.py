@@ -0,0 +1,199 @@
+import argparse
+import importlib
+import json
+import os
+import random
+import time
+from itertools import combinations
+from multiprocessing import Pool
+
+from engine import FleetGenerator, Player, check_board, load_variants, ships_lens, variant_size
+from simulator import STRATEGIES, HeadlessGame, parse_size
+
+# Круговой турнир компьютерных игроков. Каждая пара играет одни и те же заранее выбранные
+# расстановки флотов ("раздачи"), причем каждую раздачу дважды - первым ходит то один, то другой игрок.
+ELO_START = 1500  # Начальный рейтинг
+ELO_K = 16  # Насколько сильно одна партия меняет рейтинг
+
+
+#  Класс игрока по имени: стратегия из simulator.STRATEGIES или "модуль:Класс"
+def player_class(name):
+    if name in STRATEGIES:
+        return STRATEGIES[name]
+    module, _, attr = name.partition(":")
+    if not attr:
+        raise ValueError(f"Неизвестная стратегия {name}, есть: {', '.join(STRATEGIES)} или модуль:Класс")
+    cls = getattr(importlib.import_module(module), attr)
+    if not (isinstance(cls, type) and issubclass(cls, Player)):
+        raise ValueError(f"{name} - не наследник Player")
+    return cls
+
+
+#  Расстановки флотов обоих игроков в раздаче deal. Зависят только от seed и номера раздачи.
+def deal_fleets(seed, deal, size, ships):
+    random.seed(f"{seed}:deal:{deal}")
+    return list(FleetGenerator.get(size, ships).fleets(2))
+
+
+#  Партии пары игроков first и second на раздачах start..start+count-1.
+#  Возвращает ключ задачи и список (раздача, кто ходил первым, победитель, выстрелов победителя).
+def play_pairing(task):
+    key, seed, first, second, start, count, size, ships = task
+    classes = {first: player_class(first), second: player_class(second)}
+    results = []
+    for deal in range(start, start + count):
+        fleets = deal_fleets(seed, deal, size, ships)
+        for opener, other in ((first, second), (second, first)):
+            random.seed(f"{seed}:{opener}:{other}:{deal}")
+            winner, shots = HeadlessGame(size, classes[opener], classes[other], ships, fleets).loop()
+            results.append((deal, opener, opener if winner == 0 else other, shots))
+    return key, results
+
+
+#  Уже сыгранные задачи из файла контрольных точек: ключ задачи -> результаты
+def load_checkpoint(path):
+    done = {}
+    if path and os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Последняя строка могла не дописаться при остановке турнира
+                    continue
+                done[entry["task"]] = [tuple(result) for result in entry["results"]]
+    return done
+
+
+class Standings:
+    # Итоговая таблица турнира: победы, выстрелы до победы и рейтинг Эло каждого игрока
+    def __init__(self, players):
+        self.players = list(players)
+        self.games = {name: 0 for name in players}
+        self.wins = {name: 0 for name in players}
+        self.shots = {name: 0 for name in players}  # Сумма выстрелов в выигранных партиях
+        # Победы над каждым соперником
+        self.pairs = {name: {other: 0 for other in players if other != name} for name in players}
+        self.elo = {name: float(ELO_START) for name in players}
+
+    def add(self, first, second, winner, shots):
+        loser = second if winner == first else first
+        for name in (first, second):
+            self.games[name] += 1
+        self.wins[winner] += 1
+        self.shots[winner] += shots
+        self.pairs[winner][loser] += 1
+        expected = 1 / (1 + 10 ** ((self.elo[loser] - self.elo[winner]) / 400))
+        self.elo[winner] += ELO_K * (1 - expected)
+        self.elo[loser] -= ELO_K * (1 - expected)
+
+    def ranking(self):
+        return sorted(self.players, key=lambda name: -self.elo[name])
+
+    def as_dict(self):
+        return {
+            name: {
+                "elo": round(self.elo[name], 1),
+                "games": self.games[name],
+                "wins": self.wins[name],
+                "win_rate": self.wins[name] / self.games[name] if self.games[name] else 0.0,
+                "mean_shots": self.shots[name] / self.wins[name] if self.wins[name] else 0.0,
+                "wins_against": self.pairs[name],
+            }
+            for name in self.ranking()
+        }
+
+    def __str__(self):
+        lines = [f"{'Игрок':<20} {'Эло':>7} {'Игры':>7} {'Победы':>7} {'% побед':>8} {'Выстрелов':>10}"]
+        for name, row in self.as_dict().items():
+            lines.append(f"{name:<20} {row['elo']:>7.0f} {row['games']:>7} {row['wins']:>7} "
+                         f"{row['win_rate']:>8.1%} {row['mean_shots']:>10.1f}")
+        return "\n".join(lines)
+
+
+#  Турнир: deals раздач на каждую пару, по chunk раздач в одной задаче процесса
+def tournament(players, deals, size=6, ships=None, workers=None, seed=0, chunk=50, checkpoint=None):
+    ships = list(ships or ships_lens(size))
+    for name in players:
+        check_board(player_class(name), size)
+    tasks = []
+    for first, second in combinations(players, 2):
+        for start in range(0, deals, chunk):
+            count = min(chunk, deals - start)
+            key = f"{seed}|{size}|{','.join(map(str, ships))}|{first}|{second}|{start}|{count}"
+            tasks.append((key, seed, first, second, start, count, size, ships))
+
+    done = load_checkpoint(checkpoint)
+    todo = [task for task in tasks if task[0] not in done]
+    log = open(checkpoint, "a", encoding="utf-8") if checkpoint else None
+
+    def record(finished):
+        for key, results in finished:
+            done[key] = results
+            if log is not None:
+                log.write(json.dumps({"task": key, "results": results}) + "\n")
+                log.flush()
+
+    try:
+        if workers == 1:
+            record(map(play_pairing, todo))
+        else:
+            with Pool(workers) as pool:
+                record(pool.imap_unordered(play_pairing, todo))
+    finally:
+        if log is not None:
+            log.close()
+
+    # Рейтинг считается по партиям в одном и том же порядке, независимо от порядка завершения задач
+    games = []
+    for key, _, first, second, *_ in tasks:
+        for deal, opener, winner, shots in done[key]:
+            games.append((deal, first, second, opener, winner, shots))
+    games.sort(key=lambda game: (game[0], players.index(game[1]), players.index(game[2]), game[3] != game[1]))
+    standings = Standings(players)
+    for _, first, second, _, winner, shots in games:
+        standings.add(first, second, winner, shots)
+    return standings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Круговой турнир компьютерных игроков")
+    parser.add_argument("-p", "--player", action="append",
+                        help="стратегия из simulator.STRATEGIES или модуль:Класс (по умолчанию random, hunt, density)")
+    parser.add_argument("-n", "--deals", type=int, default=200, help="кол-во раздач на каждую пару игроков")
+    parser.add_argument("-s", "--size", type=parse_size, default=6, help="размер доски: 10 или 12x16")
+    parser.add_argument("--variant", help="вариант игры из файла настроек (размер доски и корабли)")
+    parser.add_argument("--config", help="файл настроек с вариантами игры")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="кол-во процессов (по умолчанию все ядра)")
+    parser.add_argument("--seed", type=int, default=0, help="начальное значение генератора случайных чисел")
+    parser.add_argument("--chunk", type=int, default=50, help="кол-во раздач в одной задаче процесса")
+    parser.add_argument("--checkpoint", help="файл, в который дописываются сыгранные задачи; при повторном "
+                                             "запуске они не переигрываются")
+    parser.add_argument("--json", action="store_true", help="вывести таблицу в формате JSON")
+    args = parser.parse_args(argv)
+
+    players = args.player or ["random", "hunt", "density"]
+    if len(set(players)) < 2:
+        parser.error("нужно хотя бы два разных игрока")
+    size, ships = args.size, None
+    if args.variant:
+        variants = {variant["name"]: variant for variant in load_variants(args.config)}
+        if args.variant not in variants:
+            parser.error(f"нет варианта {args.variant}, есть: {', '.join(variants)}")
+        size, ships = variant_size(variants[args.variant]), variants[args.variant]["ships"]
+
+    started = time.perf_counter()
+    try:
+        standings = tournament(list(dict.fromkeys(players)), args.deals, size, ships, args.workers, args.seed,
+                               args.chunk, args.checkpoint)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.json:
+        print(json.dumps(standings.as_dict(), ensure_ascii=False, indent=2))
+    else:
+        print(standings)
+        print(f"Время: {time.perf_counter() - started:.1f} с")
+
+
+if __name__ == "__main__":
+    main()